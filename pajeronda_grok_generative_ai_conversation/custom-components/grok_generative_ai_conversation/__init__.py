@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from functools import partial
+from dataclasses import dataclass
 from types import MappingProxyType
+from typing import Any
 
 from openai import AsyncOpenAI
 from openai import APIConnectionError, AuthenticationError, RateLimitError, BadRequestError
@@ -40,7 +41,6 @@ from .const import (
     DOMAIN,
     LOGGER,
     RECOMMENDED_AI_TASK_OPTIONS,
-    RECOMMENDED_CHAT_MODEL,
     RECOMMENDED_CONVERSATION_OPTIONS,
     TIMEOUT_MILLIS,
     CONF_API_ENDPOINT,
@@ -49,17 +49,88 @@ from .const import (
     CONF_TEMPERATURE,
     CONF_TOP_P,
     CONF_MAX_TOKENS,
+    CONF_EXTRA_CLIENTS,
+    CONF_AI_TASK_CACHE,
+    CONF_CACHE_ENABLED,
+    CONF_CACHE_TTL,
+    CONF_CACHE_MAX_SIZE,
+    RECOMMENDED_CACHE_TTL,
+    RECOMMENDED_CACHE_MAX_SIZE,
+    CACHE_FILENAME,
+    PHASE_ROUTER,
+    PHASE_SERVICE,
+    CONF_ATTACHMENT_MAX_SIZE,
+    CONF_COMPACT_CONTEXT,
+    RECOMMENDED_ATTACHMENT_MAX_SIZE,
+    CONF_RECORD_TRAFFIC,
+    CONF_TRACE_ENDPOINT,
+    CONF_TRACE_TURNS,
+    RECORDER_FILENAME,
+    TRACE_FILENAME,
+    REPLAY_DEFAULT_LIMIT,
+    PROFILE_DEFAULT_TURNS,
+    PROFILE_DEFAULT_DURATION,
 )
+from .attachments import AttachmentEncoder, async_encode_media, async_encode_path
+from .client_pool import GrokClientPool, PooledClient, parse_client_specs
+from .cache import ResultCache
+from .circuit_breaker import CircuitBreaker
+from .coalesce import SingleFlight, request_key
+from .entity_context import ExposedEntityContext
+from .jobs import JobManager
+from .llm_api_cache import AssistAPICache
+from .profile import resolve_profile
+from .profiler import TurnProfiler
+from .recorder import TrafficRecorder, read_recording
+from .replay import async_replay_turn, summarize
+from .tracing import Tracer
+from .usage import UsageStats
 
 SERVICE_GENERATE_CONTENT = "generate_content"
+SERVICE_GET_CACHE_INFO = "get_cache_info"
+SERVICE_CLEAR_CACHE = "clear_cache"
+SERVICE_REPLAY_TRAFFIC = "replay_traffic"
+SERVICE_PROFILE = "profile"
+SERVICE_GET_JOB_RESULT = "get_job_result"
+CONF_ATTACHMENTS = "attachments"
+CONF_FILENAMES = "filenames"
+CONF_FILENAME = "filename"
+CONF_SPEED = "speed"
+CONF_LIMIT = "limit"
+CONF_TURNS = "turns"
+CONF_DURATION = "duration"
+CONF_BACKGROUND = "background"
+CONF_JOB_ID = "job_id"
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 PLATFORMS = (
     Platform.AI_TASK,
+    Platform.BINARY_SENSOR,
     Platform.CONVERSATION,
+    Platform.SENSOR,
 )
 
-type GrokGenerativeAIConfigEntry = ConfigEntry[AsyncOpenAI]
+
+
+@dataclass
+class GrokRuntimeData:
+    """Runtime data shared by the entities and services of a config entry."""
+
+    client: GrokClientPool
+    single_flight: SingleFlight
+    breaker: CircuitBreaker
+    assist_api: AssistAPICache
+    entity_context: ExposedEntityContext
+    attachments: AttachmentEncoder
+    profiler: TurnProfiler
+    jobs: JobManager
+    usage: UsageStats
+    cache: ResultCache | None = None
+    recorder: TrafficRecorder | None = None
+    tracer: Tracer | None = None
+
+
+type GrokGenerativeAIConfigEntry = ConfigEntry[GrokRuntimeData]
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
@@ -67,43 +138,88 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     await async_migrate_integration(hass)
 
     async def generate_content(call: ServiceCall) -> ServiceResponse:
-        """Generate content from a text prompt (attachments not supported)."""
+        """Generate content from a text prompt and optional images."""
         prompt: str = call.data[CONF_PROMPT]
-        model: str = call.data.get(CONF_CHAT_MODEL, RECOMMENDED_CHAT_MODEL)
-        temperature: float | None = call.data.get(CONF_TEMPERATURE)
-        top_p: float | None = call.data.get(CONF_TOP_P)
-        max_tokens: int | None = call.data.get(CONF_MAX_TOKENS)
-
-        # Get client from first loaded entry
-        config_entry: GrokGenerativeAIConfigEntry = (
-            hass.config_entries.async_loaded_entries(DOMAIN)[0]
-        )
-        client = config_entry.runtime_data
 
-        # Build API parameters, only including non-None values
+        # The client pool of the (single) loaded entry routes the request
+        entries = hass.config_entries.async_loaded_entries(DOMAIN)
+        if not entries:
+            raise HomeAssistantError("Grok Generative AI is not loaded")
+        config_entry: GrokGenerativeAIConfigEntry = entries[0]
+        runtime_data = config_entry.runtime_data
+
+        # Start from the service profile, explicit call values take precedence
+        profile = resolve_profile(
+            PHASE_SERVICE, config_entry.options, config_entry.data
+        )
         api_params = {
-            "model": model,
             "messages": [{"role": "user", "content": prompt}],
+            **profile.as_request_kwargs(),
         }
-        if temperature is not None:
-            api_params["temperature"] = temperature
-        if top_p is not None:
-            api_params["top_p"] = top_p
-        if max_tokens is not None:
-            api_params["max_tokens"] = max_tokens
-
-        try:
-            resp = await client.chat.completions.create(**api_params)
-        except AuthenticationError as err:
-            raise HomeAssistantError(f"Authentication failed: {err}") from err
-        except (APIConnectionError, RateLimitError, BadRequestError, Exception) as err:
-            raise HomeAssistantError(f"Content generation error: {err}") from err
 
-        text = (resp.choices[0].message.content if resp.choices else None) or ""
-        if not text:
-            raise HomeAssistantError("Unknown error generating content")
-
-        return {"text": text}
+        encoder = runtime_data.attachments
+        attachments = [
+            *[
+                await async_encode_media(hass, encoder, media["media_content_id"])
+                for media in call.data.get(CONF_ATTACHMENTS, [])
+            ],
+            *[
+                await async_encode_path(hass, encoder, filename)
+                for filename in call.data.get(CONF_FILENAMES, [])
+            ],
+        ]
+        for key, param in (
+            (CONF_CHAT_MODEL, "model"),
+            (CONF_TEMPERATURE, "temperature"),
+            (CONF_TOP_P, "top_p"),
+            (CONF_MAX_TOKENS, "max_tokens"),
+        ):
+            if (value := call.data.get(key)) is not None:
+                api_params[param] = value
+
+        # Key on the content hashes, not on the encoded images
+        key = request_key(
+            **api_params, attachments=[attachment.digest for attachment in attachments]
+        )
+        if attachments:
+            api_params["messages"] = [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        *(attachment.part for attachment in attachments),
+                    ],
+                }
+            ]
+
+        async def _generate() -> str:
+            try:
+                resp = await runtime_data.client.async_create_chat_completion(
+                    **api_params
+                )
+            except AuthenticationError as err:
+                raise HomeAssistantError(f"Authentication failed: {err}") from err
+            except (APIConnectionError, RateLimitError, BadRequestError, Exception) as err:
+                raise HomeAssistantError(f"Content generation error: {err}") from err
+
+            if resp.usage is not None:
+                runtime_data.usage.async_record(resp.usage)
+            text = (resp.choices[0].message.content if resp.choices else None) or ""
+            if not text:
+                raise HomeAssistantError("Unknown error generating content")
+            return text
+
+        async def _run() -> str:
+            # Identical deterministic requests fired together share one upstream call
+            if api_params.get("temperature") == 0:
+                return await runtime_data.single_flight.async_do(key, _generate)
+            return await _generate()
+
+        if call.data[CONF_BACKGROUND]:
+            job = runtime_data.jobs.async_submit(_run)
+            return {"job_id": job.job_id}
+
+        return {"text": await _run()}
 
     hass.services.async_register(
         DOMAIN,
@@ -116,10 +232,153 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
                 vol.Optional(CONF_TEMPERATURE): vol.Coerce(float),
                 vol.Optional(CONF_TOP_P): vol.Coerce(float),
                 vol.Optional(CONF_MAX_TOKENS): vol.Coerce(int),
+                vol.Optional(CONF_ATTACHMENTS, default=list): vol.All(
+                    cv.ensure_list,
+                    [
+                        vol.Schema(
+                            {vol.Required("media_content_id"): cv.string},
+                            extra=vol.ALLOW_EXTRA,
+                        )
+                    ],
+                ),
+                vol.Optional(CONF_FILENAMES, default=list): vol.All(
+                    cv.ensure_list, [cv.string]
+                ),
+                vol.Optional(CONF_BACKGROUND, default=False): cv.boolean,
             }
         ),
         supports_response=SupportsResponse.ONLY,
     )
+
+    def _get_cache() -> ResultCache:
+        """Return the result cache of the loaded entry."""
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN):
+            if entry.runtime_data.cache is not None:
+                return entry.runtime_data.cache
+        raise HomeAssistantError("The AI Task result cache is not enabled")
+
+    async def get_cache_info(call: ServiceCall) -> ServiceResponse:
+        """Return statistics about the AI Task result cache."""
+        return await _get_cache().async_info()
+
+    async def clear_cache(call: ServiceCall) -> ServiceResponse:
+        """Remove every entry from the AI Task result cache."""
+        return {"removed": await _get_cache().async_clear()}
+
+    async def replay_traffic(call: ServiceCall) -> ServiceResponse:
+        """Replay recorded turns against a stand-in client and report timings."""
+        entries = hass.config_entries.async_loaded_entries(DOMAIN)
+        if not entries:
+            raise HomeAssistantError("Grok Generative AI is not loaded")
+        config_entry: GrokGenerativeAIConfigEntry = entries[0]
+        subentry = next(
+            (
+                subentry
+                for subentry in config_entry.subentries.values()
+                if subentry.subentry_type == "conversation"
+            ),
+            None,
+        )
+        if subentry is None:
+            raise HomeAssistantError("No conversation agent to replay with")
+
+        requested = call.data.get(CONF_FILENAME)
+        filename = requested or hass.config.path(RECORDER_FILENAME)
+
+        def read_turns() -> list[dict[str, Any]]:
+            """Read the recording, checking a requested file is allowed (executor)."""
+            if requested and not hass.config.is_allowed_path(filename):
+                raise HomeAssistantError(
+                    f"Cannot read {filename}, add its directory to allowlist_external_dirs"
+                )
+            return read_recording(filename, call.data[CONF_LIMIT])
+
+        try:
+            turns = await hass.async_add_executor_job(read_turns)
+        except OSError as err:
+            raise HomeAssistantError(f"Cannot read {filename}: {err}") from err
+
+        # One turn at a time, so timings are not skewed by each other
+        results = [
+            await async_replay_turn(
+                hass, config_entry, subentry, turn, call.data[CONF_SPEED]
+            )
+            for turn in turns
+        ]
+        return {"summary": summarize(results), "turns": results}
+
+    async def get_job_result(call: ServiceCall) -> ServiceResponse:
+        """Return the status and result of a background generation."""
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN):
+            try:
+                return entry.runtime_data.jobs.async_get(call.data[CONF_JOB_ID]).as_dict()
+            except HomeAssistantError:
+                continue
+        raise HomeAssistantError(f"Unknown or expired job {call.data[CONF_JOB_ID]}")
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_JOB_RESULT,
+        get_job_result,
+        schema=vol.Schema({vol.Required(CONF_JOB_ID): cv.string}),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the next conversation turns."""
+        entries = hass.config_entries.async_loaded_entries(DOMAIN)
+        if not entries:
+            raise HomeAssistantError("Grok Generative AI is not loaded")
+        config_entry: GrokGenerativeAIConfigEntry = entries[0]
+        return await config_entry.runtime_data.profiler.async_run(
+            call.data[CONF_TURNS], call.data[CONF_DURATION]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        profile,
+        schema=vol.Schema(
+            {
+                vol.Optional(CONF_TURNS, default=PROFILE_DEFAULT_TURNS): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
+                vol.Optional(CONF_DURATION, default=PROFILE_DEFAULT_DURATION): vol.All(
+                    vol.Coerce(float), vol.Range(min=1)
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_TRAFFIC,
+        replay_traffic,
+        schema=vol.Schema(
+            {
+                vol.Optional(CONF_FILENAME): cv.string,
+                vol.Optional(CONF_SPEED, default=1.0): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_LIMIT, default=REPLAY_DEFAULT_LIMIT): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_CACHE_INFO,
+        get_cache_info,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_CACHE,
+        clear_cache,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     return True
 
 
@@ -127,20 +386,37 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: GrokGenerativeAIConfigEntry
 ) -> bool:
     """Set up Grok Generative AI Conversation from a config entry."""
-    # Initialize OpenAI-compatible client pointing to X.ai
-    api_endpoint = entry.data.get(CONF_API_ENDPOINT, DEFAULT_API_ENDPOINT)
+    # Initialize OpenAI-compatible clients, the primary one points to X.ai
+    api_key = entry.data[CONF_API_KEY]
+    api_endpoint = (
+        entry.options.get(CONF_API_ENDPOINT)
+        or entry.data.get(CONF_API_ENDPOINT, DEFAULT_API_ENDPOINT)
+    )
+    specs = [
+        (api_endpoint, api_key),
+        *parse_client_specs(
+            entry.options.get(CONF_EXTRA_CLIENTS), api_endpoint, api_key
+        ),
+    ]
+
+    def _create_clients() -> list[PooledClient]:
+        return [
+            PooledClient(
+                name=f"{endpoint} (...{key[-4:]})",
+                client=AsyncOpenAI(
+                    api_key=key,
+                    base_url=endpoint,
+                    timeout=TIMEOUT_MILLIS / 1000,
+                ),
+            )
+            for endpoint, key in specs
+        ]
+
     try:
         # Avoid blocking call (certificate loading) in event loop
-        client = await hass.async_add_executor_job(
-            partial(
-                AsyncOpenAI,
-                api_key=entry.data[CONF_API_KEY],
-                base_url=api_endpoint,
-                timeout=TIMEOUT_MILLIS / 1000,
-            )
-        )
+        pool = GrokClientPool(await hass.async_add_executor_job(_create_clients))
         # Basic verification: list models
-        await client.models.list()
+        await pool.async_verify()
     except AuthenticationError as err:
         raise ConfigEntryAuthFailed(str(err)) from err
     except APIConnectionError as err:
@@ -148,7 +424,54 @@ async def async_setup_entry(
     except Exception as err:
         raise ConfigEntryError(err) from err
     else:
-        entry.runtime_data = client
+        pool.breaker = CircuitBreaker(hass, pool.async_probe)
+        pool.probe_model = resolve_profile(PHASE_ROUTER, entry.options, entry.data).model
+        entry.runtime_data = GrokRuntimeData(
+            client=pool,
+            single_flight=SingleFlight(hass),
+            breaker=pool.breaker,
+            assist_api=AssistAPICache(hass),
+            entity_context=ExposedEntityContext(hass),
+            profiler=TurnProfiler(hass),
+            jobs=JobManager(hass),
+            usage=UsageStats(),
+            attachments=AttachmentEncoder(
+                hass,
+                int(
+                    entry.options.get(
+                        CONF_ATTACHMENT_MAX_SIZE, RECOMMENDED_ATTACHMENT_MAX_SIZE
+                    )
+                ),
+            ),
+        )
+        entry.async_on_unload(entry.runtime_data.assist_api.async_setup())
+        if entry.options.get(CONF_COMPACT_CONTEXT, False):
+            entry.async_on_unload(entry.runtime_data.entity_context.async_setup())
+
+    cache_options = entry.options.get(CONF_AI_TASK_CACHE) or {}
+    if cache_options.get(CONF_CACHE_ENABLED, False):
+        entry.runtime_data.cache = ResultCache(
+            hass,
+            hass.config.path(CACHE_FILENAME),
+            ttl=cache_options.get(CONF_CACHE_TTL, RECOMMENDED_CACHE_TTL) * 3600,
+            max_bytes=int(
+                cache_options.get(CONF_CACHE_MAX_SIZE, RECOMMENDED_CACHE_MAX_SIZE)
+                * 1024
+                * 1024
+            ),
+        )
+
+    if entry.options.get(CONF_RECORD_TRAFFIC, False):
+        entry.runtime_data.recorder = TrafficRecorder(
+            hass, hass.config.path(RECORDER_FILENAME)
+        )
+
+    if entry.options.get(CONF_TRACE_TURNS, False):
+        entry.runtime_data.tracer = Tracer(
+            hass,
+            hass.config.path(TRACE_FILENAME),
+            entry.options.get(CONF_TRACE_ENDPOINT),
+        )
 
     # Ensure subentries exist for new installations
     if not any(se.subentry_type == "conversation" for se in entry.subentries.values()):
@@ -184,6 +507,11 @@ async def async_unload_entry(
     """Unload GrokGenerativeAI."""
     if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         return False
+    await entry.runtime_data.breaker.async_shutdown()
+    await entry.runtime_data.jobs.async_shutdown()
+    await entry.runtime_data.client.async_close()
+    if entry.runtime_data.cache is not None:
+        await entry.runtime_data.cache.async_close()
     return True
 
 
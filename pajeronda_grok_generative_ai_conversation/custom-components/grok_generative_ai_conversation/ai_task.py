@@ -1,6 +1,10 @@
 """AI Task integration for Grok Generative AI Conversation."""
 
 from json import JSONDecodeError
+import re
+from typing import Any
+
+import voluptuous as vol
 
 from homeassistant.components import ai_task, conversation
 from homeassistant.config_entries import ConfigEntry
@@ -9,8 +13,18 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.util.json import json_loads
 
-from .const import LOGGER
-from .entity import ERROR_GETTING_RESPONSE, GrokGenerativeAILLMBaseEntity
+from .const import (
+    LOGGER,
+    PHASE_AI_TASK,
+    STRUCTURED_OUTPUT_EXECUTOR_THRESHOLD,
+    STRUCTURED_OUTPUT_REPAIR_PROMPT,
+)
+from .coalesce import request_key
+from .entity import (
+    ERROR_GETTING_RESPONSE,
+    GrokGenerativeAILLMBaseEntity,
+    format_structured_output,
+)
 
 
 async def async_setup_entry(
@@ -28,6 +42,31 @@ async def async_setup_entry(
             config_subentry_id=subentry.subentry_id,
         )
 
+_CLOCK_TIME_RE = re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?\b")
+
+
+def _parse_structured_response(text: str, structure: vol.Schema) -> Any:
+    """Parse a JSON response and validate it against the task structure."""
+    text = text.strip()
+    # Tolerate a Markdown code fence around the JSON document
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    return structure(json_loads(text))
+
+
+def _key_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop the clock time from system messages so identical tasks share a key.
+
+    The date is kept, so results of day dependent tasks do not leak into the
+    next day.
+    """
+    return [
+        {**message, "content": _CLOCK_TIME_RE.sub("", message["content"])}
+        if message["role"] == "system" and isinstance(message["content"], str)
+        else message
+        for message in messages
+    ]
+
 
 class GrokGenerativeAITaskEntity(
     ai_task.AITaskEntity,
@@ -37,7 +76,9 @@ class GrokGenerativeAITaskEntity(
 
     _attr_supported_features = (
         ai_task.AITaskEntityFeature.GENERATE_DATA
+        | ai_task.AITaskEntityFeature.SUPPORT_ATTACHMENTS
     )
+    _profile_phase = PHASE_AI_TASK
 
     async def _async_generate_data(
         self,
@@ -45,41 +86,114 @@ class GrokGenerativeAITaskEntity(
         chat_log: conversation.ChatLog,
     ) -> ai_task.GenDataTaskResult:
         """Handle a generate data task."""
-        await self._async_handle_chat_log(chat_log, task.structure)
-
-        # Get the LAST available AssistantContent, not necessarily the last log element.
-        last_assistant = None
-        for item in reversed(chat_log.content):
-            if isinstance(item, conversation.AssistantContent):
-                last_assistant = item
-                break
+        profile = self._resolve_profile(self._profile_phase)
+        attachments = await self._async_encode_attachments(chat_log)
+        key = request_key(
+            profile=profile.as_request_kwargs(),
+            messages=_key_messages(self._build_openai_messages(chat_log)),
+            attachments=[attachment.digest for attachment in attachments.values()],
+            structure=(
+                format_structured_output(task.structure, chat_log.llm_api)
+                if task.structure
+                else None
+            ),
+        )
 
-        if last_assistant is None:
-            LOGGER.error(
-                "Last assistant message not found in chat log. Tail: %s. This could be due to the model not returning a valid response",
-                chat_log.content[-1] if chat_log.content else None,
+        cache = self.entry.runtime_data.cache
+        cached = await cache.async_get(key) if cache is not None else None
+        if cached is not None:
+            LOGGER.debug("AI Task result served from cache")
+            text = cached
+            self._add_assistant_text(chat_log, text)
+        else:
+            text = await self._async_generate_text(
+                chat_log, task.structure, key, shared=profile.temperature == 0
             )
-            raise HomeAssistantError(ERROR_GETTING_RESPONSE)
-
-        text = last_assistant.content or ""
 
         if not task.structure:
-            return ai_task.GenDataTaskResult(
-                conversation_id=chat_log.conversation_id,
-                data=text,
-            )
-
-        try:
-            data = json_loads(text)
-        except JSONDecodeError as err:
-            LOGGER.error(
-                "Failed to parse JSON response: %s. Response: %s",
-                err,
-                text,
-            )
-            raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
+            data: Any = text
+        else:
+            try:
+                data = await self._async_parse_structured(text, task.structure)
+            except (JSONDecodeError, vol.Invalid) as err:
+                # One targeted repair turn is cheaper than failing the whole task
+                LOGGER.warning("Invalid structured response, requesting a repair: %s", err)
+                chat_log.async_add_user_content(
+                    conversation.UserContent(
+                        content=STRUCTURED_OUTPUT_REPAIR_PROMPT.format(error=err)
+                    )
+                )
+                await self._async_handle_chat_log(chat_log, task.structure)
+                text = self._get_last_assistant_text(chat_log)
+                try:
+                    data = await self._async_parse_structured(text, task.structure)
+                except (JSONDecodeError, vol.Invalid) as err:
+                    LOGGER.error(
+                        "Failed to parse JSON response: %s. Response: %s",
+                        err,
+                        text,
+                    )
+                    raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
+
+        # Only valid results are cached, so a hit never needs a repair turn
+        if cache is not None and cached is None:
+            await cache.async_set(key, text)
 
         return ai_task.GenDataTaskResult(
             conversation_id=chat_log.conversation_id,
             data=data,
         )
+
+    async def _async_generate_text(
+        self,
+        chat_log: conversation.ChatLog,
+        structure: vol.Schema | None,
+        key: str,
+        *,
+        shared: bool,
+    ) -> str:
+        """Generate the response, sharing identical in-flight deterministic tasks."""
+        if not shared:
+            await self._async_handle_chat_log(chat_log, structure)
+            return self._get_last_assistant_text(chat_log)
+
+        leader = False
+
+        async def _generate() -> str:
+            nonlocal leader
+            leader = True
+            await self._async_handle_chat_log(chat_log, structure)
+            return self._get_last_assistant_text(chat_log)
+
+        text = await self.entry.runtime_data.single_flight.async_do(key, _generate)
+        if not leader:
+            # Another task produced the text, record it in this task's chat log
+            self._add_assistant_text(chat_log, text)
+        return text
+
+    def _add_assistant_text(self, chat_log: conversation.ChatLog, text: str) -> None:
+        """Record a response that was not streamed into this chat log."""
+        chat_log.async_add_assistant_content_without_tools(
+            conversation.AssistantContent(agent_id=self.entity_id, content=text)
+        )
+
+    def _get_last_assistant_text(self, chat_log: conversation.ChatLog) -> str:
+        """Return the text of the last assistant message in the chat log."""
+        # Get the LAST available AssistantContent, not necessarily the last log element.
+        for item in reversed(chat_log.content):
+            if isinstance(item, conversation.AssistantContent):
+                return item.content or ""
+
+        LOGGER.error(
+            "Last assistant message not found in chat log. Tail: %s. This could be due to the model not returning a valid response",
+            chat_log.content[-1] if chat_log.content else None,
+        )
+        raise HomeAssistantError(ERROR_GETTING_RESPONSE)
+
+    async def _async_parse_structured(self, text: str, structure: vol.Schema) -> Any:
+        """Parse and validate a structured response, off the event loop if large."""
+        if len(text) > STRUCTURED_OUTPUT_EXECUTOR_THRESHOLD:
+            return await self.hass.async_add_executor_job(
+                _parse_structured_response, text, structure
+            )
+        return _parse_structured_response(text, structure)
@@ -0,0 +1,243 @@
+"""Image attachments for xAI vision requests."""
+
+from __future__ import annotations
+
+import base64
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import io
+import mimetypes
+from pathlib import Path
+import threading
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    ATTACHMENT_CACHE_SIZE,
+    ATTACHMENT_JPEG_QUALITY,
+    ATTACHMENT_READ_CHUNK,
+    DOMAIN,
+    LOGGER,
+)
+
+try:
+    from PIL import Image
+except ImportError:  # Downscaling is skipped without Pillow
+    Image = None
+
+CAMERA_MEDIA_PREFIX = "media-source://camera/"
+# Image formats accepted by the xAI vision models as is
+UPLOAD_MIME_TYPES = ("image/jpeg", "image/png")
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedAttachment:
+    """An attachment ready to be sent as a message content part."""
+
+    digest: str
+    part: dict[str, Any]
+
+
+def _file_digest(path: Path) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(ATTACHMENT_READ_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stream_base64(path: Path) -> str:
+    """Base64 encode a file in chunks, without reading it whole."""
+    parts = []
+    with path.open("rb") as file:
+        # The chunk size is a multiple of 3, so the chunks concatenate cleanly
+        while chunk := file.read(ATTACHMENT_READ_CHUNK):
+            parts.append(base64.b64encode(chunk).decode())
+    return "".join(parts)
+
+
+class AttachmentEncoder:
+    """Encode images as data URLs, downscaled and cached by content hash.
+
+    Upload size dominates the latency of vision requests, so images larger than
+    max_size pixels are downscaled and re-encoded as JPEG when Pillow is
+    available. The same content is encoded once, however many prompts use it.
+    Encoding runs in the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_size: int) -> None:
+        """Initialize the encoder."""
+        self.hass = hass
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._encoded: OrderedDict[str, EncodedAttachment] = OrderedDict()
+        # Content hash per (path, mtime, size), so unchanged files are not re-read
+        self._digests: dict[tuple[str, int, int], str] = {}
+
+    async def async_encode_file(
+        self, path: Path, mime_type: str | None = None
+    ) -> EncodedAttachment:
+        """Encode an image file."""
+        return await self.hass.async_add_executor_job(
+            self._encode_file, Path(path), mime_type
+        )
+
+    async def async_encode_bytes(
+        self, data: bytes, mime_type: str
+    ) -> EncodedAttachment:
+        """Encode an image held in memory, such as a camera snapshot."""
+        return await self.hass.async_add_executor_job(
+            self._encode_bytes, data, mime_type
+        )
+
+    def _encode_file(self, path: Path, mime_type: str | None) -> EncodedAttachment:
+        """Encode an image file (executor)."""
+        mime_type = self._check_mime_type(
+            mime_type or mimetypes.guess_type(path)[0], path.name
+        )
+        # The file may vanish or become unreadable at any point
+        try:
+            return self._encode_path(path, mime_type)
+        except OSError as err:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="attachment_unreadable",
+                translation_placeholders={"name": path.name, "error": str(err)},
+            ) from err
+
+    def _encode_path(self, path: Path, mime_type: str) -> EncodedAttachment:
+        """Encode an image file, OSError if it cannot be read (executor)."""
+        stat = path.stat()
+        stat_key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+        if digest is None:
+            digest = _file_digest(path)
+            with self._lock:
+                if len(self._digests) >= ATTACHMENT_CACHE_SIZE * 4:
+                    self._digests.clear()
+                self._digests[stat_key] = digest
+
+        if (cached := self._get_cached(digest)) is not None:
+            return cached
+        if (data := self._downscale(path, mime_type, path.name)) is not None:
+            mime_type, encoded = data
+        else:
+            encoded = _stream_base64(path)
+        return self._store(digest, mime_type, encoded)
+
+    def _encode_bytes(self, data: bytes, mime_type: str) -> EncodedAttachment:
+        """Encode an image held in memory (executor)."""
+        mime_type = self._check_mime_type(mime_type, "snapshot")
+        digest = hashlib.sha256(data).hexdigest()
+        if (cached := self._get_cached(digest)) is not None:
+            return cached
+        downscaled = self._downscale(io.BytesIO(data), mime_type, "snapshot")
+        if downscaled is not None:
+            mime_type, encoded = downscaled
+        else:
+            encoded = base64.b64encode(data).decode()
+        return self._store(digest, mime_type, encoded)
+
+    @staticmethod
+    def _check_mime_type(mime_type: str | None, name: str) -> str:
+        """Return the MIME type if it is an image."""
+        if not mime_type or not mime_type.startswith("image/"):
+            raise HomeAssistantError(
+                f"Unsupported attachment {name}: only images can be sent to Grok"
+            )
+        return mime_type
+
+    def _downscale(
+        self, source: Path | io.BytesIO, mime_type: str, name: str
+    ) -> tuple[str, str] | None:
+        """Return a re-encoded JPEG if the image is too large or not uploadable."""
+        if Image is None:
+            if mime_type not in UPLOAD_MIME_TYPES:
+                LOGGER.warning("Pillow is not available, sending %s as is", mime_type)
+            return None
+
+        # Unidentified and truncated images raise an OSError
+        try:
+            with Image.open(source) as image:
+                too_large = self.max_size > 0 and max(image.size) > self.max_size
+                if not too_large and mime_type in UPLOAD_MIME_TYPES:
+                    return None
+                if too_large:
+                    image.thumbnail((self.max_size, self.max_size))
+                buffer = io.BytesIO()
+                image.convert("RGB").save(
+                    buffer, format="JPEG", quality=ATTACHMENT_JPEG_QUALITY
+                )
+        except Image.DecompressionBombError as err:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="attachment_too_many_pixels",
+                translation_placeholders={"name": name},
+            ) from err
+        except OSError as err:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="attachment_unreadable",
+                translation_placeholders={"name": name, "error": str(err)},
+            ) from err
+        return "image/jpeg", base64.b64encode(buffer.getvalue()).decode()
+
+    def _get_cached(self, digest: str) -> EncodedAttachment | None:
+        """Return an already encoded attachment."""
+        with self._lock:
+            if (cached := self._encoded.get(digest)) is not None:
+                self._encoded.move_to_end(digest)
+            return cached
+
+    def _store(self, digest: str, mime_type: str, encoded: str) -> EncodedAttachment:
+        """Remember an encoded attachment, evicting the least recently used."""
+        attachment = EncodedAttachment(
+            digest=digest,
+            part={
+                "type": "image_url",
+                "image_url": {"url": f"data:{mime_type};base64,{encoded}"},
+            },
+        )
+        with self._lock:
+            self._encoded[digest] = attachment
+            while len(self._encoded) > ATTACHMENT_CACHE_SIZE:
+                self._encoded.popitem(last=False)
+        return attachment
+
+
+async def async_encode_media(
+    hass: HomeAssistant, encoder: AttachmentEncoder, media_content_id: str
+) -> EncodedAttachment:
+    """Encode a media source item, taking a snapshot for cameras."""
+    if media_content_id.startswith(CAMERA_MEDIA_PREFIX):
+        from homeassistant.components import camera
+
+        entity_id = media_content_id.removeprefix(CAMERA_MEDIA_PREFIX)
+        image = await camera.async_get_image(hass, entity_id)
+        return await encoder.async_encode_bytes(image.content, image.content_type)
+
+    from homeassistant.components import media_source
+
+    resolved = await media_source.async_resolve_media(hass, media_content_id, None)
+    if resolved.path is None:
+        raise HomeAssistantError(
+            f"Only local media can be attached, got {media_content_id}"
+        )
+    return await encoder.async_encode_file(resolved.path, resolved.mime_type)
+
+
+async def async_encode_path(
+    hass: HomeAssistant, encoder: AttachmentEncoder, filename: str
+) -> EncodedAttachment:
+    """Encode a file from an allowlisted directory."""
+    # Checking the allowlist resolves the path, which touches the filesystem
+    if not await hass.async_add_executor_job(hass.config.is_allowed_path, filename):
+        raise HomeAssistantError(
+            f"Cannot read {filename}, add its directory to allowlist_external_dirs"
+        )
+    return await encoder.async_encode_file(Path(filename))
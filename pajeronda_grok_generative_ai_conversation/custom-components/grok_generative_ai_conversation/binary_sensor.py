@@ -0,0 +1,68 @@
+"""Binary sensor platform for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+
+from .const import DEFAULT_TITLE, DOMAIN
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddConfigEntryEntitiesCallback,
+) -> None:
+    """Set up binary sensors."""
+    async_add_entities([GrokCircuitBreakerSensor(config_entry)])
+
+
+class GrokCircuitBreakerSensor(BinarySensorEntity):
+    """On while xAI is bypassed and turns are handled locally only."""
+
+    _attr_has_entity_name = True
+    _attr_translation_key = "circuit_breaker"
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        self._breaker = entry.runtime_data.breaker
+        self._attr_unique_id = f"{entry.entry_id}_circuit_breaker"
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title or DEFAULT_TITLE,
+            manufacturer="xAI",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if the circuit is not closed."""
+        return not self._breaker.allows_requests
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the breaker details."""
+        return {
+            "state": self._breaker.state.value,
+            "consecutive_failures": self._breaker.consecutive_failures,
+            "cooldown": self._breaker.cooldown,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the breaker state."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._breaker.async_add_listener(self.async_write_ha_state)
+        )
@@ -0,0 +1,162 @@
+"""Persistent result cache for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import LOGGER
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+class ResultCache:
+    """Size bounded SQLite cache with TTL and LRU eviction.
+
+    All database work runs in the executor; a lock serializes the executor
+    threads sharing the connection.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, ttl: float, max_bytes: int
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection, opening the database on first use."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+        return self._conn
+
+    def _get(self, key: str) -> str | None:
+        """Read a value, dropping it when expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def _set(self, key: str, value: str) -> None:
+        """Write a value and enforce the TTL and size limits."""
+        now = time.time()
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Evict least recently used entries until the limit is respected
+            for old_key, old_size in conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used"
+            ).fetchall():
+                conn.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                total -= old_size
+                if total <= self.max_bytes:
+                    break
+
+    def _info(self) -> dict[str, Any]:
+        """Collect cache statistics."""
+        with self._lock:
+            count, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        return {
+            "entries": count,
+            "size_bytes": total,
+            "max_size_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "path": self.path,
+        }
+
+    def _clear(self) -> int:
+        """Delete every entry."""
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM results")
+            return cursor.rowcount
+
+    def _close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def async_get(self, key: str) -> str | None:
+        """Return a cached value or None."""
+        try:
+            value = await self.hass.async_add_executor_job(self._get, key)
+        except sqlite3.Error as err:
+            LOGGER.warning("Error reading the result cache: %s", err)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def async_set(self, key: str, value: str) -> None:
+        """Store a value."""
+        try:
+            await self.hass.async_add_executor_job(self._set, key, value)
+        except sqlite3.Error as err:
+            LOGGER.warning("Error writing the result cache: %s", err)
+
+    async def async_info(self) -> dict[str, Any]:
+        """Return statistics about the cache."""
+        try:
+            return await self.hass.async_add_executor_job(self._info)
+        except sqlite3.Error as err:
+            raise HomeAssistantError(f"Error reading the result cache: {err}") from err
+
+    async def async_clear(self) -> int:
+        """Remove all entries, returning how many were removed."""
+        try:
+            return await self.hass.async_add_executor_job(self._clear)
+        except sqlite3.Error as err:
+            raise HomeAssistantError(f"Error clearing the result cache: {err}") from err
+
+    async def async_close(self) -> None:
+        """Close the database."""
+        await self.hass.async_add_executor_job(self._close)
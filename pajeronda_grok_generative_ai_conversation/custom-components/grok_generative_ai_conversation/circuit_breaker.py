@@ -0,0 +1,153 @@
+"""Circuit breaker around the xAI clients."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_COOLDOWN,
+    DOMAIN,
+    LOGGER,
+)
+
+
+class CircuitState(StrEnum):
+    """State of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(HomeAssistantError):
+    """Raised when a request is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling xAI after consecutive failures and probe until it recovers.
+
+    While the circuit is not closed requests are refused immediately. After a
+    cooldown a background probe runs (half open): success closes the circuit,
+    failure opens it again with a doubled cooldown.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        probe: Callable[[], Awaitable[object]],
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.hass = hass
+        self._probe = probe
+        self.failure_threshold = failure_threshold
+        self._base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._unsub_probe: CALLBACK_TYPE | None = None
+        self._probe_task: asyncio.Task[None] | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def allows_requests(self) -> bool:
+        """Return True if requests may be sent upstream."""
+        return self.state is CircuitState.CLOSED
+
+    def check(self) -> None:
+        """Raise if requests may not be sent upstream."""
+        if not self.allows_requests:
+            raise CircuitOpenError(f"xAI circuit is {self.state}")
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for state changes, returning a callable that removes the listener."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_set_state(self, state: CircuitState) -> None:
+        """Update the state and notify listeners."""
+        if state is self.state:
+            return
+        LOGGER.warning("xAI circuit breaker is now %s", state)
+        self.state = state
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def record_success(self) -> None:
+        """Record a successful upstream request."""
+        self.consecutive_failures = 0
+        self.cooldown = self._base_cooldown
+        self._async_set_state(CircuitState.CLOSED)
+
+    @callback
+    def record_failure(self) -> None:
+        """Record a failed upstream request."""
+        self.consecutive_failures += 1
+        if (
+            self.state is CircuitState.CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._async_open()
+
+    @callback
+    def _async_open(self) -> None:
+        """Open the circuit and schedule a probe."""
+        self._async_set_state(CircuitState.OPEN)
+        self._async_cancel_probe()
+        self._unsub_probe = async_call_later(
+            self.hass, self.cooldown, self._async_schedule_probe
+        )
+
+    @callback
+    def _async_schedule_probe(self, _now: object) -> None:
+        """Start the half open probe."""
+        self._unsub_probe = None
+        self._probe_task = self.hass.async_create_background_task(
+            self._async_probe(), f"{DOMAIN} circuit breaker probe"
+        )
+
+    async def _async_probe(self) -> None:
+        """Probe upstream, closing the circuit on success."""
+        self._async_set_state(CircuitState.HALF_OPEN)
+        try:
+            await self._probe()
+        except Exception as err:
+            LOGGER.debug("xAI circuit breaker probe failed: %s", err)
+            self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN)
+            self._async_open()
+        else:
+            self.record_success()
+        finally:
+            self._probe_task = None
+
+    @callback
+    def _async_cancel_probe(self) -> None:
+        """Cancel a scheduled probe."""
+        if self._unsub_probe is not None:
+            self._unsub_probe()
+            self._unsub_probe = None
+
+    async def async_shutdown(self) -> None:
+        """Stop probing, waiting for a running probe to be cancelled."""
+        self._async_cancel_probe()
+        self._listeners.clear()
+        if (task := self._probe_task) is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,237 @@
+"""Client pool with health based routing for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    AuthenticationError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from .circuit_breaker import CircuitBreaker
+from .const import (
+    LOGGER,
+    RECOMMENDED_CHAT_MODEL,
+    POOL_DEFAULT_LATENCY,
+    POOL_EWMA_ALPHA,
+    POOL_FAILURE_COOLDOWN,
+    POOL_LOW_HEADROOM,
+    POOL_RATE_LIMIT_COOLDOWN,
+)
+
+# Errors that only concern one client, so another client may still succeed
+FAILOVER_ERRORS = (
+    APIConnectionError,
+    AuthenticationError,
+    InternalServerError,
+    RateLimitError,
+)
+
+
+def parse_client_specs(
+    value: str | list[str] | None, default_endpoint: str, default_api_key: str
+) -> list[tuple[str, str]]:
+    """Parse additional clients, one per item as `<endpoint> <api_key>`.
+
+    Either part may be omitted: an item with only a URL reuses the primary API
+    key, an item with only a key reuses the primary endpoint. Clients saved
+    before they were masked are a string with one client per line.
+    """
+    lines = value.splitlines() if isinstance(value, str) else value or []
+    specs: list[tuple[str, str]] = []
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) >= 2:
+            specs.append((parts[0], parts[1]))
+        elif parts[0].startswith(("http://", "https://")):
+            specs.append((parts[0], default_api_key))
+        else:
+            specs.append((default_endpoint, parts[0]))
+    return specs
+
+
+def _header_int(headers: Any, name: str) -> int | None:
+    """Return an integer response header, if present."""
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class ClientHealth:
+    """Rolling health statistics for one client."""
+
+    latency: float | None = None
+    error_rate: float = 0.0
+    remaining_requests: int | None = None
+    limit_requests: int | None = None
+    cooldown_until: float = 0.0
+
+    @property
+    def headroom(self) -> float:
+        """Fraction of the request rate limit still available."""
+        if self.remaining_requests is None or not self.limit_requests:
+            return 0.0 if self.remaining_requests == 0 else 1.0
+        return self.remaining_requests / self.limit_requests
+
+    def score(self, now: float) -> float:
+        """Expected cost of sending a request to this client, lower is better."""
+        latency = POOL_DEFAULT_LATENCY if self.latency is None else self.latency
+        score = latency * (1 + 4 * self.error_rate)
+        if self.headroom < POOL_LOW_HEADROOM:
+            score *= 4
+        if self.cooldown_until > now:
+            score += 1000
+        return score
+
+
+@dataclass(slots=True)
+class PooledClient:
+    """An OpenAI-compatible client and its health."""
+
+    name: str
+    client: AsyncOpenAI
+    health: ClientHealth = field(default_factory=ClientHealth)
+
+    def record_success(self, latency: float, headers: Any) -> None:
+        """Update the statistics after a successful request."""
+        health = self.health
+        health.latency = (
+            latency
+            if health.latency is None
+            else POOL_EWMA_ALPHA * latency + (1 - POOL_EWMA_ALPHA) * health.latency
+        )
+        health.error_rate *= 1 - POOL_EWMA_ALPHA
+        health.remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        health.limit_requests = _header_int(headers, "x-ratelimit-limit-requests")
+
+    def record_failure(self, err: Exception) -> None:
+        """Update the statistics after a failed request."""
+        health = self.health
+        health.error_rate = POOL_EWMA_ALPHA + (1 - POOL_EWMA_ALPHA) * health.error_rate
+        if isinstance(err, RateLimitError):
+            retry_after = _header_int(err.response.headers, "retry-after")
+            health.cooldown_until = time.monotonic() + (
+                retry_after or POOL_RATE_LIMIT_COOLDOWN
+            )
+            health.remaining_requests = 0
+        elif isinstance(err, APIConnectionError):
+            health.cooldown_until = time.monotonic() + POOL_FAILURE_COOLDOWN
+
+
+class GrokClientPool:
+    """Route requests to the healthiest client and fail over on client errors."""
+
+    def __init__(self, clients: list[PooledClient]) -> None:
+        """Initialize the pool, the first client is the primary one."""
+        self.clients = clients
+        self.breaker: CircuitBreaker | None = None
+        # Model of the one-token completion used to probe the clients
+        self.probe_model = RECOMMENDED_CHAT_MODEL
+
+    @property
+    def primary(self) -> AsyncOpenAI:
+        """Return the primary client."""
+        return self.clients[0].client
+
+    def _ranked(self) -> list[PooledClient]:
+        """Return the clients ordered by health, configuration order breaks ties."""
+        now = time.monotonic()
+        return sorted(self.clients, key=lambda pooled: pooled.health.score(now))
+
+    async def async_create_chat_completion(self, **kwargs: Any) -> Any:
+        """Create a chat completion (or stream) on the healthiest client.
+
+        A stream can still stall or time out after it is created, so for
+        streams the caller reports the outcome to the circuit breaker. A
+        timeout is the budget of all attempts: each one gets an even share of
+        what is left, so a hanging client leaves time to fail over.
+        """
+        if self.breaker is not None:
+            self.breaker.check()
+        ranked = self._ranked()
+        timeout = kwargs.get("timeout")
+        budget_end = (
+            time.monotonic() + timeout if isinstance(timeout, (int, float)) else None
+        )
+        last_err: Exception | None = None
+        for index, pooled in enumerate(ranked):
+            start = time.monotonic()
+            if budget_end is not None:
+                if (remaining := budget_end - start) <= 0:
+                    break
+                kwargs["timeout"] = remaining / (len(ranked) - index)
+            try:
+                raw = await pooled.client.chat.completions.with_raw_response.create(
+                    **kwargs
+                )
+            except FAILOVER_ERRORS as err:
+                pooled.record_failure(err)
+                LOGGER.debug("Client %s failed, trying next: %s", pooled.name, err)
+                last_err = err
+                continue
+            pooled.record_success(time.monotonic() - start, raw.headers)
+            if self.breaker is not None and not kwargs.get("stream"):
+                self.breaker.record_success()
+            return raw.parse()
+
+        # Every client failed, this is an upstream outage
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        if last_err is None:
+            raise TimeoutError("No time left to call xAI")
+        raise last_err
+
+    async def async_probe(self) -> None:
+        """Check that at least one client answers a chat completion."""
+        last_err: Exception | None = None
+        for pooled in self._ranked():
+            try:
+                await pooled.client.chat.completions.create(
+                    model=self.probe_model,
+                    messages=[{"role": "user", "content": "ping"}],
+                    max_tokens=1,
+                )
+            except Exception as err:
+                last_err = err
+                continue
+            pooled.health.cooldown_until = 0.0
+            return
+        assert last_err is not None
+        raise last_err
+
+    async def async_verify(self) -> None:
+        """Verify the clients, raising the primary error if none is usable.
+
+        An invalid primary API key is always raised, other failures only mark
+        the client unhealthy as long as one client is reachable.
+        """
+        results = await asyncio.gather(
+            *(pooled.client.models.list() for pooled in self.clients),
+            return_exceptions=True,
+        )
+        primary_result = results[0]
+        if isinstance(primary_result, AuthenticationError) or all(
+            isinstance(result, Exception) for result in results
+        ):
+            raise primary_result
+        for pooled, result in zip(self.clients, results):
+            if isinstance(result, Exception):
+                LOGGER.warning("Client %s is not available: %s", pooled.name, result)
+                pooled.record_failure(result)
+
+    async def async_close(self) -> None:
+        """Close all clients."""
+        await asyncio.gather(
+            *(pooled.client.close() for pooled in self.clients), return_exceptions=True
+        )
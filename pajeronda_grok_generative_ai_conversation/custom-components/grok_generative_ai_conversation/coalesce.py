@@ -0,0 +1,55 @@
+"""Request coalescing for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import hashlib
+import json
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, LOGGER
+
+_T = TypeVar("_T")
+
+
+def request_key(**parts: Any) -> str:
+    """Return a canonical key for a request (model, messages, sampling, ...)."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The call runs in its own task, so a caller giving up does not cancel the
+    result the other callers are waiting for.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the single-flight group."""
+        self.hass = hass
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+
+    async def async_do(self, key: str, factory: Callable[[], Awaitable[_T]]) -> _T:
+        """Return the result of factory, joining an identical call in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self.hass.async_create_background_task(
+                factory(), f"{DOMAIN} single-flight {key[:8]}"
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._async_release(key, done))
+        else:
+            LOGGER.debug("Joining in-flight request %s", key[:8])
+        return await asyncio.shield(task)
+
+    def _async_release(self, key: str, task: asyncio.Task[Any]) -> None:
+        """Forget a finished call."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the error as retrieved when every caller has already gone away
+        if not task.cancelled():
+            task.exception()
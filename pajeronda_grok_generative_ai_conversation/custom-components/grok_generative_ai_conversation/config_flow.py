@@ -7,12 +7,18 @@ from homeassistant.config_entries import ConfigFlow, ConfigEntry, OptionsFlowWit
 from homeassistant import config_entries
 from homeassistant.const import CONF_API_KEY, CONF_LLM_HASS_API
 from homeassistant.core import callback
-from homeassistant.data_entry_flow import FlowResult
+from homeassistant.data_entry_flow import FlowResult, section
 from homeassistant.helpers import llm
 from homeassistant.helpers.selector import (
+    LanguageSelector,
+    LanguageSelectorConfig,
     SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
+    SelectSelectorMode,
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
 )
 
 from .const import (
@@ -23,14 +29,100 @@ from .const import (
     CONF_TOP_P,
     CONF_MAX_TOKENS,
     CONF_API_ENDPOINT,
+    CONF_EXTRA_CLIENTS,
     DEFAULT_API_ENDPOINT,
     RECOMMENDED_CHAT_MODEL,
     RECOMMENDED_TEMPERATURE,
     RECOMMENDED_TOP_P,
     RECOMMENDED_MAX_TOKENS,
+    CONF_REASONING_EFFORT,
+    CONF_STOP,
+    PHASES,
+    REASONING_EFFORTS,
+    CONF_AI_TASK_CACHE,
+    CONF_CACHE_ENABLED,
+    CONF_CACHE_TTL,
+    CONF_CACHE_MAX_SIZE,
+    RECOMMENDED_CACHE_TTL,
+    RECOMMENDED_CACHE_MAX_SIZE,
+    CONF_ATTACHMENT_MAX_SIZE,
+    CONF_COMPACT_CONTEXT,
+    CONF_PRELOAD_LANGUAGES,
+    RECOMMENDED_ATTACHMENT_MAX_SIZE,
+    CONF_RECORD_TRAFFIC,
+    CONF_TRACE_ENDPOINT,
+    CONF_TRACE_TURNS,
 )
 
 
+def _profile_schema(options: dict[str, Any], phase: str) -> vol.Schema:
+    """Schema for the model profile section of a phase."""
+    # Empty fields inherit the shared settings, so nothing is suggested by default
+    current = options.get(phase) or {}
+
+    def suggested(key: str) -> dict[str, Any]:
+        return {"suggested_value": current.get(key)}
+
+    return vol.Schema(
+        {
+            vol.Optional(CONF_CHAT_MODEL, description=suggested(CONF_CHAT_MODEL)): str,
+            vol.Optional(
+                CONF_TEMPERATURE, description=suggested(CONF_TEMPERATURE)
+            ): vol.Coerce(float),
+            vol.Optional(CONF_TOP_P, description=suggested(CONF_TOP_P)): vol.Coerce(float),
+            vol.Optional(CONF_MAX_TOKENS, description=suggested(CONF_MAX_TOKENS)): int,
+            vol.Optional(
+                CONF_REASONING_EFFORT, description=suggested(CONF_REASONING_EFFORT)
+            ): SelectSelector(
+                SelectSelectorConfig(
+                    options=list(REASONING_EFFORTS),
+                    mode=SelectSelectorMode.DROPDOWN,
+                    translation_key=CONF_REASONING_EFFORT,
+                    custom_value=True,
+                )
+            ),
+            vol.Optional(CONF_STOP, description=suggested(CONF_STOP)): TextSelector(
+                TextSelectorConfig(multiline=True)
+            ),
+        }
+    )
+
+
+def _extra_clients(options: dict[str, Any]) -> list[str]:
+    """Return the additional clients as a list, also when saved as lines."""
+    value = options.get(CONF_EXTRA_CLIENTS)
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    return list(value or [])
+
+
+def _cache_schema(options: dict[str, Any]) -> vol.Schema:
+    """Schema for the AI Task result cache section."""
+    current = options.get(CONF_AI_TASK_CACHE) or {}
+    return vol.Schema(
+        {
+            vol.Optional(
+                CONF_CACHE_ENABLED,
+                description={"suggested_value": current.get(CONF_CACHE_ENABLED, False)},
+            ): bool,
+            vol.Optional(
+                CONF_CACHE_TTL,
+                description={
+                    "suggested_value": current.get(CONF_CACHE_TTL, RECOMMENDED_CACHE_TTL)
+                },
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_CACHE_MAX_SIZE,
+                description={
+                    "suggested_value": current.get(
+                        CONF_CACHE_MAX_SIZE, RECOMMENDED_CACHE_MAX_SIZE
+                    )
+                },
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        }
+    )
+
+
 @config_entries.HANDLERS.register(DOMAIN)
 class GrokConfigFlow(ConfigFlow):
     """Handle a config flow for Grok Generative AI."""
@@ -87,6 +179,15 @@ class GrokOptionsFlow(OptionsFlowWithConfigEntry):
             if not user_input.get(CONF_PROMPT, "").strip():
                 user_input.pop(CONF_PROMPT, None)
 
+            # Drop cleared profile fields so they fall back to the shared settings
+            for phase in PHASES:
+                if isinstance(user_input.get(phase), dict):
+                    user_input[phase] = {
+                        key: value
+                        for key, value in user_input[phase].items()
+                        if value not in (None, "")
+                    }
+
             return self.async_create_entry(title="", data=user_input)
 
         # Get current value for suggested_value
@@ -113,6 +214,15 @@ class GrokOptionsFlow(OptionsFlowWithConfigEntry):
                             "suggested_value": self.options.get(CONF_API_ENDPOINT, DEFAULT_API_ENDPOINT)
                         },
                     ): str,
+                    vol.Optional(
+                        CONF_EXTRA_CLIENTS,
+                        description={
+                            "suggested_value": _extra_clients(self.options)
+                        },
+                    ): TextSelector(
+                        # API keys are masked, one client per field
+                        TextSelectorConfig(type=TextSelectorType.PASSWORD, multiple=True)
+                    ),
                     vol.Optional(
                         CONF_CHAT_MODEL,
                         description={
@@ -141,6 +251,52 @@ class GrokOptionsFlow(OptionsFlowWithConfigEntry):
                         CONF_LLM_HASS_API,
                         description={"suggested_value": suggested_assist},
                     ): bool,
+                    vol.Optional(
+                        CONF_COMPACT_CONTEXT,
+                        description={
+                            "suggested_value": self.options.get(CONF_COMPACT_CONTEXT, False)
+                        },
+                    ): bool,
+                    vol.Optional(
+                        CONF_ATTACHMENT_MAX_SIZE,
+                        description={
+                            "suggested_value": self.options.get(CONF_ATTACHMENT_MAX_SIZE, RECOMMENDED_ATTACHMENT_MAX_SIZE)
+                        },
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PRELOAD_LANGUAGES,
+                        description={
+                            "suggested_value": self.options.get(CONF_PRELOAD_LANGUAGES)
+                        },
+                    ): LanguageSelector(LanguageSelectorConfig(multiple=True)),
+                    vol.Optional(
+                        CONF_RECORD_TRAFFIC,
+                        description={
+                            "suggested_value": self.options.get(CONF_RECORD_TRAFFIC, False)
+                        },
+                    ): bool,
+                    vol.Optional(
+                        CONF_TRACE_TURNS,
+                        description={
+                            "suggested_value": self.options.get(CONF_TRACE_TURNS, False)
+                        },
+                    ): bool,
+                    vol.Optional(
+                        CONF_TRACE_ENDPOINT,
+                        description={
+                            "suggested_value": self.options.get(CONF_TRACE_ENDPOINT)
+                        },
+                    ): TextSelector(TextSelectorConfig(type=TextSelectorType.URL)),
+                    **{
+                        vol.Optional(phase): section(
+                            _profile_schema(self.options, phase),
+                            {"collapsed": True},
+                        )
+                        for phase in PHASES
+                    },
+                    vol.Optional(CONF_AI_TASK_CACHE): section(
+                        _cache_schema(self.options), {"collapsed": True}
+                    ),
                 }
             ),
             description_placeholders={
@@ -148,5 +304,8 @@ class GrokOptionsFlow(OptionsFlowWithConfigEntry):
                 "recommended_temperature": str(RECOMMENDED_TEMPERATURE),
                 "recommended_top_p": str(RECOMMENDED_TOP_P),
                 "recommended_max_tokens": str(RECOMMENDED_MAX_TOKENS),
+                "recommended_attachment_max_size": str(
+                    RECOMMENDED_ATTACHMENT_MAX_SIZE
+                ),
             },
         )
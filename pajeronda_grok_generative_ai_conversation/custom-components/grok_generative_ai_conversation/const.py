@@ -18,12 +18,83 @@ CONF_TEMPERATURE = "temperature"
 CONF_TOP_P = "top_p"
 CONF_MAX_TOKENS = "max_tokens"
 CONF_API_ENDPOINT = "api_endpoint"
+CONF_EXTRA_CLIENTS = "extra_clients"
 DEFAULT_API_ENDPOINT = "https://api.x.ai/v1"
 RECOMMENDED_CHAT_MODEL = "grok-3-mini"
 RECOMMENDED_TEMPERATURE = 0.0
 RECOMMENDED_TOP_P = 1.0
 RECOMMENDED_MAX_TOKENS = 2000
 
+# profile.py - Per-phase model profiles, stored as one options section per phase
+CONF_REASONING_EFFORT = "reasoning_effort"
+CONF_STOP = "stop"
+PHASE_ROUTER = "router"
+PHASE_FALLBACK = "fallback"
+PHASE_AI_TASK = "ai_task"
+PHASE_SERVICE = "service"
+PHASES = (PHASE_ROUTER, PHASE_FALLBACK, PHASE_AI_TASK, PHASE_SERVICE)
+REASONING_EFFORT_DEFAULT = "default"
+REASONING_EFFORTS = (REASONING_EFFORT_DEFAULT, "low", "high")
+MAX_STOP_SEQUENCES = 4
+# Models accepting reasoning_effort, others reject it
+REASONING_EFFORT_MODELS = ("grok-3-mini",)
+# Used over the shared settings when the phase sets no value. Routing only has
+# to emit a short answer or an [[HA_LOCAL]] tag. The recommended
+# reasoning_effort only applies to the models accepting it.
+RECOMMENDED_PHASE_PROFILES = {
+    PHASE_ROUTER: {
+        CONF_REASONING_EFFORT: "low",
+        CONF_MAX_TOKENS: 64,
+    },
+}
+
+# cache.py - Opt-in persistent cache for AI Task results (options section)
+CONF_AI_TASK_CACHE = "ai_task_cache"
+CONF_CACHE_ENABLED = "cache_enabled"
+CONF_CACHE_TTL = "cache_ttl"  # hours
+CONF_CACHE_MAX_SIZE = "cache_max_size"  # megabytes
+RECOMMENDED_CACHE_TTL = 24
+RECOMMENDED_CACHE_MAX_SIZE = 10
+CACHE_FILENAME = f"{DOMAIN}_cache.db"
+
+# attachments.py - Images sent to the vision models
+CONF_ATTACHMENT_MAX_SIZE = "attachment_max_size"  # pixels, longest side, 0 keeps it
+RECOMMENDED_ATTACHMENT_MAX_SIZE = 1024
+ATTACHMENT_JPEG_QUALITY = 85
+ATTACHMENT_CACHE_SIZE = 16  # encoded images kept by content hash
+ATTACHMENT_READ_CHUNK = 3 * 64 * 1024  # multiple of 3 for chunked base64
+
+# recorder.py - Opt-in recording of conversation turns for offline replay
+CONF_RECORD_TRAFFIC = "record_traffic"
+RECORDER_FILENAME = f"{DOMAIN}_traffic.jsonl"
+RECORDER_MAX_BYTES = 5 * 1024 * 1024
+RECORDER_BACKUP_COUNT = 3
+REPLAY_DEFAULT_LIMIT = 50
+
+# profiler.py - On-demand profiling of conversation turns
+PROFILE_DEFAULT_TURNS = 5
+PROFILE_DEFAULT_DURATION = 60  # seconds
+PROFILE_TOP_FUNCTIONS = 20
+
+# jobs.py - Background generations of the generate_content service
+EVENT_JOB_FINISHED = f"{DOMAIN}_job_finished"
+JOB_WORKERS = 3
+JOB_MAX_PENDING = 50  # queued and running jobs
+JOB_MAX_RESULTS = 100  # finished jobs kept for get_job_result
+JOB_RESULT_TTL = 3600  # seconds
+
+# client_pool.py - Health based routing between clients
+POOL_DEFAULT_LATENCY = 1.0  # seconds, assumed for clients without samples
+POOL_EWMA_ALPHA = 0.3
+POOL_LOW_HEADROOM = 0.1
+POOL_RATE_LIMIT_COOLDOWN = 10.0  # seconds, when no retry-after header is sent
+POOL_FAILURE_COOLDOWN = 5.0  # seconds, after a connection error
+
+# circuit_breaker.py - Local-only degraded mode while xAI is unavailable
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_COOLDOWN = 30.0  # seconds before the first probe
+BREAKER_MAX_COOLDOWN = 300.0
+
 # conversation.py - Recommended defaults for Conversation subentry:
 # - CONF_LLM_HASS_API defaults to False to use custom tag-based pipeline
 # - When False: custom tag pipeline (LLM → tag detection → Assist → Tools fallback)
@@ -44,9 +115,66 @@ RECOMMENDED_AI_TASK_OPTIONS = {
     CONF_MAX_TOKENS: RECOMMENDED_MAX_TOKENS,
 }
 
+# ai_task.py - Structured output handling
+STRUCTURED_OUTPUT_NAME = "ai_task_data"
+# Responses larger than this are parsed and validated in the executor
+STRUCTURED_OUTPUT_EXECUTOR_THRESHOLD = 4096
+STRUCTURED_OUTPUT_REPAIR_PROMPT = (
+    "Your previous response was not valid for the requested JSON schema: {error}. "
+    "Reply again with only the corrected JSON object."
+)
+
 # entity.py
 ERROR_GETTING_RESPONSE = "Sorry, there was a problem getting a response from Grok."
 ERROR_HANDOFF_FAILED = "I was not able to handle your request. Please try rephrasing it."
 DEFAULT_LOCAL_AGENT = "conversation.home_assistant"
+# handoff.py - Languages the local agent is prepared for at startup
+CONF_PRELOAD_LANGUAGES = "preload_languages"
 LOCAL_TAG_START = "[["
 LOCAL_TAG_RE = re.compile(r"\[\[HA_LOCAL:\s*(.*?)\s*\]\]", re.DOTALL)
+# xAI header keeping the requests of a conversation on the same prompt cache
+CONV_ID_HEADER = "x-grok-conv-id"
+# Upper bound of model calls per turn when tools are executed
+MAX_TOOL_ITERATIONS = 5
+# Streamed text is merged into larger deltas, flushed on whichever comes first
+DELTA_FLUSH_CHARS = 80
+DELTA_FLUSH_INTERVAL = 0.1  # seconds
+DELTA_SENTENCE_ENDINGS = (".", "!", "?", "\n")
+
+# deadline.py - Budget of a conversation turn across LLM, Assist and fallback
+TURN_DEADLINE = 15.0  # seconds
+FALLBACK_MIN_BUDGET = 3.0  # a fallback is a whole LLM call, skip it below this
+DEADLINE_RESERVE = 0.5  # nested phases end this much earlier than the turn
+STREAM_STALL_TIMEOUT = 10.0  # seconds xAI may take for the first or next chunk
+
+# llm_api_cache.py - Assist API instances kept per platform, language and device
+ASSIST_API_CACHE_SIZE = 32
+
+# entity_context.py - Compact exposed entity overview for the LLM API prompt
+CONF_COMPACT_CONTEXT = "compact_context"
+# First line of the entity overview in the Assist API prompt
+ENTITY_OVERVIEW_MARKER = "An overview of the areas and the devices in this smart home:"
+COMPACT_CONTEXT_HEADER = "Exposed entities by area and domain (name: state):"
+COMPACT_CONTEXT_CHANGES_HEADER = "Changes since the overview:"
+# State attributes worth sending per domain, everything else is left out
+COMPACT_CONTEXT_ATTRIBUTES = {
+    "climate": ("current_temperature", "temperature", "hvac_action"),
+    "cover": ("current_position",),
+    "fan": ("percentage",),
+    "humidifier": ("humidity",),
+    "light": ("brightness",),
+    "media_player": ("volume_level", "media_title"),
+    "valve": ("current_position",),
+    "water_heater": ("temperature",),
+}
+# A conversation gets a new overview once this share of entities changed
+COMPACT_CONTEXT_REBASE_RATIO = 0.25
+COMPACT_CONTEXT_MAX_CONVERSATIONS = 64
+
+# tracing.py - Per-turn traces in the OpenTelemetry (OTLP) JSON format
+CONF_TRACE_TURNS = "trace_turns"
+CONF_TRACE_ENDPOINT = "trace_endpoint"  # OTLP/HTTP collector, e.g. http://host:4318
+TRACE_FILENAME = f"{DOMAIN}_traces.jsonl"
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUP_COUNT = 3
+TRACE_EXPORT_TIMEOUT = 10  # seconds
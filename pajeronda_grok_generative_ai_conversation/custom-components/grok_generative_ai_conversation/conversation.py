@@ -2,16 +2,32 @@
 
 from __future__ import annotations
 
+from dataclasses import replace
 from typing import Literal
 
 from homeassistant.components import conversation
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
 from homeassistant.const import CONF_LLM_HASS_API, MATCH_ALL
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Context, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers import llm
+from homeassistant.helpers.start import async_at_started
+from homeassistant.util.ulid import ulid_now
 
-from .const import CONF_PROMPT, DOMAIN, LOGGER
+from .const import (
+    CONF_COMPACT_CONTEXT,
+    CONF_PRELOAD_LANGUAGES,
+    CONF_PROMPT,
+    DEFAULT_LOCAL_AGENT,
+    DOMAIN,
+    ERROR_GETTING_RESPONSE,
+    LOGGER,
+    TURN_DEADLINE,
+)
+from .deadline import Deadline
+from .entity_context import split_api_prompt
+from .recorder import record_turn
+from .tracing import span, trace_turn
 from .prompt_default import DEFAULT_CONVERSATION_PROMPT
 from .entity import GrokGenerativeAILLMBaseEntity
 
@@ -94,6 +110,35 @@ class GrokGenerativeAIConversationEntity(
         await super().async_added_to_hass()
         conversation.async_set_agent(self.hass, self.entry, self)
 
+        @callback
+        def _preload(_hass: HomeAssistant) -> None:
+            """Load the local agent intents in the background."""
+            self._handoff.async_prepare(self._async_preload_languages())
+
+        self.async_on_remove(async_at_started(self.hass, _preload))
+
+    @callback
+    def _async_preload_languages(self) -> list[str]:
+        """Return the languages to prepare the local agent for.
+
+        Without configured languages, these are the language of Home Assistant
+        and the languages of the Assist pipelines using this agent.
+        """
+        if languages := self.entry.options.get(CONF_PRELOAD_LANGUAGES):
+            return list(languages)
+        found = {self.hass.config.language}
+        if "assist_pipeline" in self.hass.config.components:
+            from homeassistant.components import assist_pipeline
+
+            for pipeline in assist_pipeline.async_get_pipelines(self.hass):
+                if pipeline.conversation_engine != self.entity_id:
+                    continue
+                if pipeline.conversation_language == MATCH_ALL:
+                    found.add(pipeline.language)
+                else:
+                    found.add(pipeline.conversation_language)
+        return sorted(found)
+
     async def async_will_remove_from_hass(self) -> None:
         """When entity will be removed from Home Assistant."""
         conversation.async_unset_agent(self.hass, self.entry)
@@ -103,74 +148,188 @@ class GrokGenerativeAIConversationEntity(
         self,
         user_input: conversation.ConversationInput,
         chat_log: conversation.ChatLog,
+    ) -> conversation.ConversationResult:
+        """Handle a turn, profiling and recording it when requested."""
+        runtime_data = self.entry.runtime_data
+        with (
+            runtime_data.profiler.turn(),
+            record_turn(
+                runtime_data.recorder, user_input, chat_log.conversation_id
+            ) as turn,
+            trace_turn(runtime_data.tracer, user_input),
+        ):
+            result = await self._async_handle_turn(user_input, chat_log)
+            if turn is not None:
+                turn["speech"] = result.response.speech.get("plain", {}).get("speech")
+            return result
+
+    async def _async_handle_turn(
+        self,
+        user_input: conversation.ConversationInput,
+        chat_log: conversation.ChatLog,
     ) -> conversation.ConversationResult:
         """Call the LLM using standard HA pattern."""
-        # Build system prompt using standard HA approach
-        user_prompt = self._get_str_option(CONF_PROMPT)
-        if user_prompt:
-            system_prompt = (
-                f"{DEFAULT_CONVERSATION_PROMPT}\n\n"
-                "# --- USER INSTRUCTIONS ---\n"
-                f"{user_prompt}"
-            )
-        else:
-            system_prompt = DEFAULT_CONVERSATION_PROMPT
+        # Every phase of this turn shares one budget
+        deadline = Deadline(TURN_DEADLINE)
 
-        # Get LLM API configuration
-        llm_apis = [llm.LLM_API_ASSIST] if self._get_llm_hass_api_option() else None
+        # A language seen for the first time gets the local agent ready while
+        # the model answers, in case the answer is a handoff
+        self._handoff.async_prepare((user_input.language,))
+
+        # xAI is unavailable: answer at local speed instead of waiting for timeouts
+        if not self.entry.runtime_data.breaker.allows_requests:
+            return await self._async_handle_locally(user_input, chat_log)
+
+        with span("resolve_options"):
+            # Build system prompt using standard HA approach
+            user_prompt = self._get_str_option(CONF_PROMPT)
+            if user_prompt:
+                system_prompt = (
+                    f"{DEFAULT_CONVERSATION_PROMPT}\n\n"
+                    "# --- USER INSTRUCTIONS ---\n"
+                    f"{user_prompt}"
+                )
+            else:
+                system_prompt = DEFAULT_CONVERSATION_PROMPT
+
+            # Get LLM API configuration
+            llm_apis = [llm.LLM_API_ASSIST] if self._get_llm_hass_api_option() else None
 
         try:
-            await chat_log.async_provide_llm_data(
-                user_input.as_llm_context(DOMAIN),
-                llm_apis,
-                system_prompt,
-                user_input.extra_system_prompt,
-            )
+            with span("provide_llm_data"):
+                await chat_log.async_provide_llm_data(
+                    user_input.as_llm_context(DOMAIN),
+                    llm_apis,
+                    system_prompt,
+                    user_input.extra_system_prompt,
+                )
         except conversation.ConverseError as err:
             return err.as_conversation_result()
 
+        if self.entry.options.get(CONF_COMPACT_CONTEXT, False):
+            with span("compact_context"):
+                self._apply_compact_context(chat_log)
+
         # Delegate to base entity for LLM processing and custom tag pipeline
-        await self._async_handle_chat_log(chat_log, user_input=user_input)
+        await self._async_handle_chat_log(
+            chat_log, user_input=user_input, deadline=deadline
+        )
 
         return conversation.async_get_result_from_chat_log(user_input, chat_log)
 
-    async def async_fallback_with_tools(self, text: str, language: str | None) -> str | None:
-        """Execute fallback using tools-enabled conversation pipeline."""
+    def _apply_compact_context(self, chat_log: conversation.ChatLog) -> None:
+        """Replace the entity overview of the system prompt with the compact one.
+
+        The API prompt itself is left untouched, the tools fallback still gets
+        the full overview of Home Assistant.
+        """
+        llm_api = chat_log.llm_api
+        if llm_api is None or (parts := split_api_prompt(llm_api.api_prompt)) is None:
+            return
+        instructions, _ = parts
+        overview, changes = self.entry.runtime_data.entity_context.async_prompt(
+            chat_log.conversation_id
+        )
+        compact = "\n".join(part for part in (instructions, overview, changes) if part)
+        system = chat_log.content[0]
+        chat_log.content[0] = replace(
+            system, content=system.content.replace(llm_api.api_prompt, compact, 1)
+        )
+
+    async def _async_handle_locally(
+        self,
+        user_input: conversation.ConversationInput,
+        chat_log: conversation.ChatLog,
+    ) -> conversation.ConversationResult:
+        """Handle a turn with the local agent only (degraded mode)."""
+        LOGGER.debug("xAI circuit is open, handling turn locally")
+        speech = None
         try:
-            # Create user input for fallback
-            user_input = conversation.ConversationInput(
-                text=text,
-                context=None,
-                conversation_id="fallback_tools",
-                device_id=None,
-                language=language or "en",
-                agent_id=self.entity_id,
+            result = await self._handoff.async_process(
+                user_input.text,
+                DEFAULT_LOCAL_AGENT,
+                user_input.language,
+                user_input,
             )
+            if result is not None:
+                # Errors are passed on too, the local agent explains what went wrong
+                speech = result.response.speech.get("plain", {}).get("speech")
+        except Exception as err:
+            LOGGER.warning("Local agent failed in degraded mode: %s", err)
+
+        chat_log.async_add_assistant_content_without_tools(
+            conversation.AssistantContent(
+                agent_id=self.entity_id, content=speech or ERROR_GETTING_RESPONSE
+            )
+        )
+        return conversation.async_get_result_from_chat_log(user_input, chat_log)
 
-            # Use HA's standard chat session/log pattern
-            from homeassistant.helpers.chat_session import async_get_chat_session
-            from homeassistant.components.conversation.chat_log import async_get_chat_log
+    async def async_fallback_with_tools(
+        self,
+        text: str,
+        language: str | None,
+        user_input: conversation.ConversationInput | None = None,
+        llm_api: llm.APIInstance | None = None,
+        deadline: Deadline | None = None,
+    ) -> str | None:
+        """Execute fallback in an ephemeral, tools-enabled chat log.
 
-            with (
-                async_get_chat_session(self.hass, user_input.conversation_id) as session,
-                async_get_chat_log(self.hass, session, user_input) as chat_log,
-            ):
-                # Provide tools-enabled LLM data
-                await chat_log.async_provide_llm_data(
-                    user_input.as_llm_context(DOMAIN),
-                    [llm.LLM_API_ASSIST],  # Enable tools for fallback
-                    None,  # Let HA manage the tools prompt automatically
-                    None,
+        Every fallback gets its own chat log scoped to the originating
+        conversation. It is never registered as a chat session, so concurrent
+        fallbacks from different satellites cannot interleave and nothing is
+        retained once the fallback returns.
+
+        The Assist API of the original turn is reused when it has one,
+        otherwise a cached instance is used instead of rebuilding the prompt.
+        """
+        origin_id = user_input.conversation_id if user_input else None
+        fallback_id = f"{origin_id or 'fallback'}_tools_{ulid_now()}"
+        try:
+            # Create user input for fallback, keeping the originating context
+            if user_input is not None:
+                fallback_input = replace(
+                    user_input,
+                    text=text,
+                    conversation_id=fallback_id,
+                    language=language or user_input.language,
+                    agent_id=self.entity_id,
+                    extra_system_prompt=None,
+                )
+            else:
+                fallback_input = conversation.ConversationInput(
+                    text=text,
+                    context=Context(),
+                    conversation_id=fallback_id,
+                    device_id=None,
+                    language=language or "en",
+                    agent_id=self.entity_id,
                 )
 
-                # Process with tools enabled
-                await self._async_handle_chat_log(chat_log, user_input=user_input, tools_control=True)
+            chat_log = conversation.ChatLog(self.hass, fallback_id)
+            # Provide tools-enabled LLM data without regenerating the Assist API
+            if llm_api is None or llm_api.api.id != llm.LLM_API_ASSIST:
+                llm_api = await self.entry.runtime_data.assist_api.async_get(
+                    fallback_input.as_llm_context(DOMAIN)
+                )
+            chat_log.llm_api = llm_api
+            chat_log.content[0] = conversation.SystemContent(
+                content=f"{llm.DEFAULT_INSTRUCTIONS_PROMPT}\n{llm_api.api_prompt}"
+            )
+            chat_log.async_add_user_content(conversation.UserContent(content=text))
+
+            # Process with tools enabled
+            await self._async_handle_chat_log(
+                chat_log,
+                user_input=fallback_input,
+                tools_control=True,
+                deadline=deadline,
+            )
 
-                # Get result using standard HA method
-                result = conversation.async_get_result_from_chat_log(user_input, chat_log)
+            # Get result using standard HA method
+            result = conversation.async_get_result_from_chat_log(fallback_input, chat_log)
 
-                if result and result.response and result.response.speech:
-                    return result.response.speech.get("plain", {}).get("speech")
+            if result and result.response and result.response.speech:
+                return result.response.speech.get("plain", {}).get("speech")
 
         except Exception as err:
             LOGGER.error("Error in conversation fallback with tools: %s", err, exc_info=True)
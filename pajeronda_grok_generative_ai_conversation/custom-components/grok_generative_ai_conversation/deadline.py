@@ -0,0 +1,86 @@
+"""Per-turn deadline budget for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import time
+from typing import Any
+
+from .const import STREAM_STALL_TIMEOUT
+
+
+class Deadline:
+    """Absolute time budget shared by every phase of a conversation turn."""
+
+    def __init__(self, budget: float) -> None:
+        """Start a deadline that expires budget seconds from now."""
+        self.expires_at = time.monotonic() + budget
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, needed: float) -> bool:
+        """Return True if at least needed seconds are left."""
+        return self.remaining >= needed
+
+    def shortened(self, seconds: float) -> Deadline:
+        """Return a deadline expiring the given seconds earlier."""
+        deadline = Deadline(0)
+        deadline.expires_at = self.expires_at - seconds
+        return deadline
+
+    def timeout(self) -> asyncio.Timeout:
+        """Return a timeout context manager expiring with the deadline."""
+        return asyncio.timeout(self.remaining)
+
+
+def timeout_for(deadline: Deadline | None) -> asyncio.Timeout:
+    """Return a timeout for an optional deadline (no timeout without one)."""
+    return asyncio.timeout(None) if deadline is None else deadline.timeout()
+
+
+class StallGuard:
+    """Stream wrapper bounding the wait for each chunk from upstream.
+
+    Only the time spent waiting for the first or next chunk is bounded, so
+    work the consumer does between chunks, such as running tools or a
+    handoff, never counts as a stalled upstream. stalled tells whether the
+    stream failed or timed out while waiting for upstream.
+    """
+
+    def __init__(
+        self,
+        stream: Any,
+        deadline: Deadline | None,
+        stall_timeout: float = STREAM_STALL_TIMEOUT,
+    ) -> None:
+        """Initialize the wrapper."""
+        self._stream = stream
+        self._deadline = deadline
+        self._stall_timeout = stall_timeout
+        self.stalled = False
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Yield the chunks of the wrapped stream."""
+        iterator = aiter(self._stream)
+        while True:
+            timeout = self._stall_timeout
+            if self._deadline is not None:
+                timeout = min(timeout, self._deadline.remaining)
+            # Stays set if waiting ends with an error, timeout or cancellation
+            self.stalled = True
+            try:
+                async with asyncio.timeout(timeout):
+                    event = await anext(iterator)
+            except StopAsyncIteration:
+                self.stalled = False
+                return
+            self.stalled = False
+            yield event
+
+    async def close(self) -> None:
+        """Close the wrapped stream."""
+        await self._stream.close()
@@ -3,10 +3,17 @@ from __future__ import annotations
 import json
 import re
 import ast
+import time
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, AsyncIterator, AsyncGenerator
 
-from openai import AsyncOpenAI
-from openai import APIConnectionError, AuthenticationError, RateLimitError, BadRequestError
+from openai import (
+    APIConnectionError,
+    APIError,
+    AuthenticationError,
+    BadRequestError,
+    RateLimitError,
+)
 
 from homeassistant.config_entries import ConfigSubentry
 from homeassistant.const import CONF_LLM_HASS_API
@@ -20,19 +27,41 @@ from .const import (
     DOMAIN,
     LOGGER,
     CONF_CHAT_MODEL,
-    CONF_MAX_TOKENS,
-    CONF_TEMPERATURE,
-    CONF_TOP_P,
     RECOMMENDED_CHAT_MODEL,
-    RECOMMENDED_MAX_TOKENS,
-    RECOMMENDED_TEMPERATURE,
-    RECOMMENDED_TOP_P,
+    PHASE_FALLBACK,
+    PHASE_ROUTER,
     ERROR_GETTING_RESPONSE,
     ERROR_HANDOFF_FAILED,
     DEFAULT_LOCAL_AGENT,
     LOCAL_TAG_START,
     LOCAL_TAG_RE,
+    STRUCTURED_OUTPUT_NAME,
+    MAX_TOOL_ITERATIONS,
+    CONV_ID_HEADER,
+    DELTA_FLUSH_CHARS,
+    DELTA_FLUSH_INTERVAL,
+    DELTA_SENTENCE_ENDINGS,
+    FALLBACK_MIN_BUDGET,
+    DEADLINE_RESERVE,
+)
+from .attachments import EncodedAttachment
+from .client_pool import GrokClientPool
+from .deadline import Deadline, StallGuard, timeout_for
+from .handoff import LocalAgentHandoff, speech_from_result
+from .message_cache import MessageCache
+from .profile import ModelProfile, resolve_profile
+from .prompt_layout import layout_messages
+from .recorder import record_call, record_outcome
+from .tracing import (
+    KIND_CLIENT,
+    Span,
+    set_turn_attributes,
+    span,
+    start_span,
+    trace_stream,
+    trace_tool_content,
 )
+from .usage import UsageStats
 
 if TYPE_CHECKING:
     from . import GrokGenerativeAIConfigEntry
@@ -73,6 +102,130 @@ def _format_tool_for_openai(tool: llm.Tool) -> dict[str, Any]:
     return tool_def
 
 
+def _format_tool_call(tool_call: llm.ToolInput) -> dict[str, Any]:
+    """Convert a Home Assistant tool call to OpenAI format."""
+    return {
+        "id": tool_call.id,
+        "type": "function",
+        "function": {
+            "name": tool_call.tool_name,
+            "arguments": json.dumps(tool_call.tool_args),
+        },
+    }
+
+
+def _parse_tool_args(raw: str) -> dict[str, Any]:
+    """Parse streamed tool call arguments."""
+    try:
+        args = json.loads(raw) if raw else {}
+    except json.JSONDecodeError:
+        LOGGER.warning("Invalid tool call arguments: %s", raw[:100])
+        return {}
+    return args if isinstance(args, dict) else {}
+
+
+async def _coalesce_deltas(
+    deltas: AsyncIterator[conversation.AssistantContentDeltaDict],
+) -> AsyncGenerator[conversation.AssistantContentDeltaDict, None]:
+    """Merge small content deltas before they reach the chat log.
+
+    The first text is passed through at once to keep time to first audio low.
+    After that, text is held until a sentence ends, DELTA_FLUSH_CHARS are
+    pending or DELTA_FLUSH_INTERVAL has passed since the last flush. Deltas
+    without text (role, tool calls) flush pending text and pass through.
+    """
+    pending: list[str] = []
+    pending_chars = 0
+    last_flush: float | None = None
+
+    async for delta in deltas:
+        content = delta.get("content")
+        if not content or len(delta) != 1:
+            if pending:
+                yield {"content": "".join(pending)}
+                pending.clear()
+                pending_chars = 0
+                last_flush = time.monotonic()
+            yield delta
+            continue
+
+        pending.append(content)
+        pending_chars += len(content)
+        now = time.monotonic()
+        if (
+            last_flush is None
+            or pending_chars >= DELTA_FLUSH_CHARS
+            or now - last_flush >= DELTA_FLUSH_INTERVAL
+            or content.rstrip(" ").endswith(DELTA_SENTENCE_ENDINGS)
+        ):
+            yield {"content": "".join(pending)}
+            pending.clear()
+            pending_chars = 0
+            last_flush = now
+
+    if pending:
+        yield {"content": "".join(pending)}
+
+
+def format_structured_output(
+    structure: Any, llm_api: llm.APIInstance | None
+) -> dict[str, Any]:
+    """Convert an AI Task structure to an OpenAI json_schema response format."""
+    from voluptuous_openapi import convert
+
+    schema = convert(
+        structure,
+        custom_serializer=(
+            llm_api.custom_serializer if llm_api else llm.selector_serializer
+        ),
+    )
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": STRUCTURED_OUTPUT_NAME, "schema": schema},
+    }
+
+
+def _convert_content(content: Any) -> dict[str, Any] | None:
+    """Convert one chat log content to an OpenAI message, None to skip it."""
+    role = getattr(content, 'role', None)
+    if role == 'tool_result':
+        return {
+            "role": "tool",
+            "tool_call_id": content.tool_call_id,
+            "content": json.dumps(content.tool_result),
+        }
+    if role is None or role == 'tool' or not hasattr(content, 'content'):
+        return None
+    message: dict[str, Any] = {
+        "role": role,
+        "content": _as_message_content(content.content)
+    }
+    if role == 'assistant' and getattr(content, 'tool_calls', None):
+        message["tool_calls"] = [
+            _format_tool_call(tool_call) for tool_call in content.tool_calls
+        ]
+    return message
+
+
+def _with_attachments(
+    message: dict[str, Any],
+    content_attachments: list[Any],
+    encoded: dict[Path, EncodedAttachment],
+) -> dict[str, Any]:
+    """Return a copy of a user message with its images as content parts."""
+    return {
+        **message,
+        "content": [
+            {"type": "text", "text": message["content"]},
+            *(
+                encoded[attachment.path].part
+                for attachment in content_attachments
+                if attachment.path in encoded
+            ),
+        ],
+    }
+
+
 def _parse_handoff_payload(raw: str) -> tuple[str, str | None]:
     """Parse handoff payload from tag content."""
     raw = raw.strip()
@@ -107,6 +260,9 @@ def _parse_handoff_payload(raw: str) -> tuple[str, str | None]:
 class GrokGenerativeAILLMBaseEntity(Entity):
     """Base entity for Grok Generative AI integrations."""
 
+    # Model profile used for regular (non fallback) requests of this entity
+    _profile_phase: str = PHASE_ROUTER
+
     def __init__(
         self,
         entry: "GrokGenerativeAIConfigEntry",
@@ -117,7 +273,11 @@ class GrokGenerativeAILLMBaseEntity(Entity):
         self.entry = entry
         self.subentry = subentry
         self._attr_name = subentry.title
-        self._client: AsyncOpenAI = entry.runtime_data
+        self._client: GrokClientPool = entry.runtime_data.client
+        self._local_handoff: LocalAgentHandoff | None = None
+        self._formatted_tools: tuple[list[llm.Tool], list[dict[str, Any]]] | None = None
+        self._message_cache = MessageCache()
+        self._usage: UsageStats = entry.runtime_data.usage
         self._attr_unique_id = subentry.subentry_id
         self._attr_device_info = dr.DeviceInfo(
             identifiers={(DOMAIN, subentry.subentry_id)},
@@ -127,24 +287,81 @@ class GrokGenerativeAILLMBaseEntity(Entity):
             entry_type=dr.DeviceEntryType.SERVICE,
         )
 
-    def _build_openai_messages(self, chat_log: conversation.ChatLog) -> list[dict[str, Any]]:
-        """Build OpenAI-compatible messages from chat log content."""
-        messages = []
+    @property
+    def _handoff(self) -> LocalAgentHandoff:
+        """Return the handoff layer, created once hass is available."""
+        if self._local_handoff is None:
+            self._local_handoff = LocalAgentHandoff(self.hass)
+        return self._local_handoff
+
+    def _format_tools(self, tools: list[llm.Tool]) -> list[dict[str, Any]]:
+        """Convert tools to OpenAI format, reusing the last conversion.
+
+        Cached Assist API instances share their tool list, so the schemas only
+        need converting again after the cache is invalidated.
+        """
+        if self._formatted_tools is None or self._formatted_tools[0] is not tools:
+            self._formatted_tools = (
+                tools,
+                [_format_tool_for_openai(tool) for tool in tools],
+            )
+        return self._formatted_tools[1]
+
+    def _resolve_profile(self, phase: str) -> ModelProfile:
+        """Resolve the model profile for a phase (subentry, then root options/data)."""
+        return resolve_profile(
+            phase, self.subentry.data, self.entry.options, self.entry.data
+        )
+
+    async def _async_encode_attachments(
+        self, chat_log: conversation.ChatLog
+    ) -> dict[Path, EncodedAttachment]:
+        """Encode the image attachments of the user messages in the chat log."""
+        encoded: dict[Path, EncodedAttachment] = {}
         for content in chat_log.content:
-            if hasattr(content, 'role') and hasattr(content, 'content'):
-                if getattr(content, 'role', None) not in ('tool', 'tool_result'):
-                    messages.append({
-                        "role": content.role,
-                        "content": _as_message_content(content.content)
-                    })
-        return messages
+            for attachment in getattr(content, "attachments", None) or ():
+                if attachment.path not in encoded:
+                    encoded[attachment.path] = (
+                        await self.entry.runtime_data.attachments.async_encode_file(
+                            attachment.path, attachment.mime_type
+                        )
+                    )
+        return encoded
+
+    def _build_openai_messages(
+        self,
+        chat_log: conversation.ChatLog,
+        attachments: dict[Path, EncodedAttachment] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Build OpenAI-compatible messages from chat log content.
+
+        Only content added since the previous call is converted, see
+        MessageCache. Attachments are added on top of the cached messages and
+        the result is laid out for prompt caching, see layout_messages.
+        """
+        pairs = self._message_cache.messages(chat_log, _convert_content)
+        if not attachments:
+            messages = [message for _, message in pairs]
+        else:
+            messages = [
+                _with_attachments(message, content.attachments, attachments)
+                if message["role"] == "user" and getattr(content, "attachments", None)
+                else message
+                for content, message in pairs
+            ]
+        return layout_messages(messages, chat_log)
 
     async def _process_tag_handoff(
         self,
         buffer: str,
-        user_input: conversation.ConversationInput | None
+        user_input: conversation.ConversationInput | None,
+        llm_api: llm.APIInstance | None = None,
+        deadline: Deadline | None = None,
     ) -> AsyncGenerator[conversation.AssistantContentDeltaDict, None]:
-        """Process handoff tag and yield appropriate response."""
+        """Process handoff tag and yield appropriate response.
+
+        Each phase only starts if the turn deadline leaves enough time for it.
+        """
         LOGGER.debug("Processing handoff: %s", buffer[:50])
 
         match = LOCAL_TAG_RE.search(buffer.strip())
@@ -162,38 +379,62 @@ class GrokGenerativeAILLMBaseEntity(Entity):
 
             language = getattr(user_input, "language", "en") if user_input else "en"
 
-            # Step 1: Try Assist
+            # Honour the agent requested by the tag, but never hand off to ourselves
+            target_agent = (
+                agent_id
+                if agent_id and agent_id not in (self.entity_id, self.entry.entry_id)
+                else DEFAULT_LOCAL_AGENT
+            )
+
+            # Step 1: Try Assist in-process, without a service bus round trip
+            # Nested phases end just before the turn so a late phase fails gracefully
+            phase_deadline = deadline.shortened(DEADLINE_RESERVE) if deadline else None
             try:
-                conversation_result = await self.hass.services.async_call(
-                    "conversation", "process",
+                with span(
+                    "assist",
                     {
-                        "text": text,
-                        "language": language,
-                        "agent_id": DEFAULT_LOCAL_AGENT,
+                        "conversation.agent_id": target_agent,
+                        "conversation.language": language,
                     },
-                    blocking=True,
-                    return_response=True,
-                )
-
-                # Parse result
-                speech = None
-                intent_success = False
-
-                if hasattr(conversation_result, 'get'):
-                    response = conversation_result.get("response", {})
-                    speech = response.get("speech", {}).get("plain", {}).get("speech")
-                    intent_success = response.get("response_type") != "error"
-
-                if speech and intent_success:
+                ):
+                    async with timeout_for(phase_deadline):
+                        conversation_result = await self._handoff.async_process(
+                            text, target_agent, language, user_input
+                        )
+                        if (
+                            conversation_result is None
+                            and target_agent != DEFAULT_LOCAL_AGENT
+                        ):
+                            conversation_result = await self._handoff.async_process(
+                                text, DEFAULT_LOCAL_AGENT, language, user_input
+                            )
+
+                if speech := speech_from_result(conversation_result):
+                    record_outcome("assist", {"agent": target_agent, "speech": speech})
                     yield {"content": speech}
                     return
 
             except Exception as e:
                 LOGGER.warning("Assist processing failed: %s", e)
 
-            # Step 2: Fallback with Tools
+            # Step 2: Fallback with Tools, a whole LLM call that may not fit anymore
+            if deadline is not None and not deadline.allows(FALLBACK_MIN_BUDGET):
+                LOGGER.warning("Skipping tools fallback, turn deadline too close")
+                yield {"content": ERROR_HANDOFF_FAILED}
+                return
+
             LOGGER.debug("Trying tools fallback for: %s", text[:30])
-            fallback_response = await self._async_fallback_with_tools(text, language)
+            with span("fallback") as fallback_span:
+                fallback_response = await self._async_fallback_with_tools(
+                    text,
+                    language,
+                    user_input,
+                    llm_api,
+                    phase_deadline,
+                )
+                if fallback_span is not None and not fallback_response:
+                    fallback_span.error = "No answer from the tools fallback"
+            record_outcome("fallback", fallback_response)
             if fallback_response:
                 yield {"content": fallback_response}
             else:
@@ -205,13 +446,20 @@ class GrokGenerativeAILLMBaseEntity(Entity):
             LOGGER.error("Tag handoff error - buffer: %s, payload: %s", buffer[:100], locals().get('payload', 'N/A'))
             yield {"content": ERROR_HANDOFF_FAILED}
 
-    async def _async_fallback_with_tools(self, text: str, language: str | None) -> str | None:
+    async def _async_fallback_with_tools(
+        self,
+        text: str,
+        language: str | None,
+        user_input: conversation.ConversationInput | None = None,
+        llm_api: llm.APIInstance | None = None,
+        deadline: Deadline | None = None,
+    ) -> str | None:
         """Execute fallback using conversation entity's tools method."""
+        fallback = getattr(self, "async_fallback_with_tools", None)
+        if fallback is None:
+            return None
         try:
-            conv_agent = conversation.async_get_agent(self.hass, self.entry.entry_id)
-            if not conv_agent or not hasattr(conv_agent, 'async_fallback_with_tools'):
-                return None
-            return await conv_agent.async_fallback_with_tools(text, language)
+            return await fallback(text, language, user_input, llm_api, deadline)
         except Exception as err:
             LOGGER.error("Error in tools fallback: %s", err)
             return None
@@ -223,47 +471,81 @@ class GrokGenerativeAILLMBaseEntity(Entity):
         *,
         user_input: conversation.ConversationInput | None = None,
         tools_control: bool | None = None,
+        deadline: Deadline | None = None,
     ) -> None:
-        """Process chat log using standard HA pattern with custom tag pipeline."""
-        options = self.subentry.data
-        model_name = options.get(CONF_CHAT_MODEL, RECOMMENDED_CHAT_MODEL)
-        temperature = options.get(CONF_TEMPERATURE, RECOMMENDED_TEMPERATURE)
-        top_p = options.get(CONF_TOP_P, RECOMMENDED_TOP_P)
-        max_tokens = options.get(CONF_MAX_TOKENS, RECOMMENDED_MAX_TOKENS)
+        """Process chat log using standard HA pattern with custom tag pipeline.
 
-        # Build messages from chat_log content using HA standard approach
-        messages = self._build_openai_messages(chat_log)
+        With a deadline, the upstream request, the stream and any handoff it
+        triggers are bounded by the remaining budget of the turn.
+        """
+        options = self.subentry.data
 
         # Determine if tools should be used
         user_wants_tools = options.get(CONF_LLM_HASS_API, False)
         # Custom pipeline is always used EXCEPT when explicitly forcing tools (fallback mode)
         bypass_custom_pipeline = tools_control is True
+        # Structured output is plain JSON and never a handoff, skip tag detection for it
+        direct_stream = bypass_custom_pipeline or structure is not None
         should_use_tools = tools_control if tools_control is not None else user_wants_tools
+        phase = PHASE_FALLBACK if bypass_custom_pipeline else self._profile_phase
+        profile = self._resolve_profile(phase)
+        # Upstream errors met while streaming, for the circuit breaker
+        stream_errors: list[Exception] = []
 
         async def _transform_stream(
             result: AsyncIterator[Any], user_input: conversation.ConversationInput | None
         ) -> AsyncGenerator[conversation.AssistantContentDeltaDict, None]:
             """Transform OpenAI stream to HA format with custom tag pipeline."""
 
-            # Only bypass custom pipeline when explicitly in fallback mode
-            if bypass_custom_pipeline:
-                LOGGER.debug("Using direct tools mode (fallback)")
+            # Only bypass custom pipeline in fallback mode or for structured output
+            if direct_stream:
+                LOGGER.debug("Using direct stream mode (fallback or structured output)")
                 yield {"role": "assistant"}
+                # Tool calls arrive in fragments, indexed by position
+                tool_calls: dict[int, dict[str, str]] = {}
                 async for event in result:
+                    if (usage := getattr(event, "usage", None)) is not None:
+                        self._usage.async_record(usage)
                     for choice in getattr(event, "choices", []) or []:
                         delta = getattr(choice, "delta", None)
-                        if delta and delta.content:
+                        if not delta:
+                            continue
+                        if delta.content:
                             yield {"content": delta.content}
+                        for tool_call in getattr(delta, "tool_calls", None) or []:
+                            call = tool_calls.setdefault(
+                                tool_call.index, {"id": "", "name": "", "args": ""}
+                            )
+                            if tool_call.id:
+                                call["id"] = tool_call.id
+                            if tool_call.function and tool_call.function.name:
+                                call["name"] += tool_call.function.name
+                            if tool_call.function and tool_call.function.arguments:
+                                call["args"] += tool_call.function.arguments
+                if tool_calls:
+                    yield {
+                        "tool_calls": [
+                            llm.ToolInput(
+                                id=call["id"],
+                                tool_name=call["name"],
+                                tool_args=_parse_tool_args(call["args"]),
+                            )
+                            for _, call in sorted(tool_calls.items())
+                        ]
+                    }
                 return
 
             # Custom tag pipeline - simple detection
             buffer = ""
             tag_detected = False
+            tag_span: Span | None = None
 
             yield {"role": "assistant"}
 
             try:
                 async for event in result:
+                    if (usage := getattr(event, "usage", None)) is not None:
+                        self._usage.async_record(usage)
                     for choice in getattr(event, "choices", []) or []:
                         delta = getattr(choice, "delta", None)
                         if not delta or not delta.content:
@@ -279,6 +561,8 @@ class GrokGenerativeAILLMBaseEntity(Entity):
                             if stripped_buffer.startswith("[["):
                                 LOGGER.debug("Tag detected: %s", buffer[:50])
                                 tag_detected = True
+                                # Until the whole tag has streamed in
+                                tag_span = start_span("tag_parse")
                                 continue
 
                             # If we have any non-whitespace content that's not [[, it's conversation
@@ -294,13 +578,20 @@ class GrokGenerativeAILLMBaseEntity(Entity):
                             yield {"content": content_chunk}
 
                 # Process accumulated tag content or remaining buffer
+                if tag_span is not None:
+                    tag_span.attributes["tag.length"] = len(buffer)
+                    tag_span.finish()
                 if tag_detected is True and buffer:
-                    async for delta in self._process_tag_handoff(buffer, user_input):
+                    async for delta in self._process_tag_handoff(
+                        buffer, user_input, chat_log.llm_api, deadline
+                    ):
                         yield delta
                 elif buffer:
                     yield {"content": buffer}
 
             except Exception as err:
+                if isinstance(err, APIError):
+                    stream_errors.append(err)
                 LOGGER.error("Error in stream transformation: %s", err, exc_info=True)
                 LOGGER.error("Stream state - tag_detected: %s, buffer length: %d, buffer content: %s",
                            tag_detected, len(buffer), buffer[:100] if buffer else "empty")
@@ -308,36 +599,128 @@ class GrokGenerativeAILLMBaseEntity(Entity):
 
         # Configure request
         request_kwargs: dict[str, Any] = dict(
-            model=model_name,
-            messages=messages,
-            temperature=temperature,
-            top_p=top_p,
-            max_tokens=max_tokens,
             stream=True,
-            stop=None,
+            # The last chunk reports the usage, including cached prompt tokens
+            stream_options={"include_usage": True},
+            # Routes the turns of a conversation to the same prompt cache. Tools
+            # fallbacks run in throwaway chat logs but share their large prompt,
+            # so they all use one route per entry.
+            extra_headers={
+                CONV_ID_HEADER: (
+                    f"{self.entry.entry_id}_{PHASE_FALLBACK}"
+                    if bypass_custom_pipeline
+                    else chat_log.conversation_id
+                )
+            },
+            **profile.as_request_kwargs(),
         )
 
+        if structure is not None:
+            request_kwargs["response_format"] = format_structured_output(
+                structure, chat_log.llm_api
+            )
+
         # Add tools if enabled and available
         if should_use_tools and chat_log.llm_api and chat_log.llm_api.tools:
             if bypass_custom_pipeline:
                 LOGGER.debug("Adding %d tools to LLM request (fallback mode)", len(chat_log.llm_api.tools))
-                request_kwargs["tools"] = [_format_tool_for_openai(tool) for tool in chat_log.llm_api.tools]
+                request_kwargs["tools"] = self._format_tools(chat_log.llm_api.tools)
                 request_kwargs["tool_choice"] = "auto"
 
-        try:
-            stream = await self._client.chat.completions.create(**request_kwargs)
-        except (
-            AuthenticationError,
-            APIConnectionError,
-            RateLimitError,
-            BadRequestError,
-            Exception,
-        ) as err:
-            LOGGER.error("Error calling xAI: %s", err)
-            raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
-
-        # Use HA's native streaming with our custom tag pipeline
-        async for _ in chat_log.async_add_delta_content_stream(
-            self.entity_id, _transform_stream(stream, user_input)
-        ):
-            pass
+        # Encoded once per turn, the encoder caches them across turns
+        with span("encode_attachments"):
+            attachments = await self._async_encode_attachments(chat_log)
+        set_turn_attributes({"gen_ai.request.model": profile.model})
+
+        # Tool results are sent back to the model, a bounded number of times
+        for iteration in range(MAX_TOOL_ITERATIONS):
+            with span(
+                "llm",
+                {
+                    "gen_ai.system": "xai",
+                    "gen_ai.request.model": profile.model,
+                    "gen_ai.conversation.id": chat_log.conversation_id,
+                    "pipeline.phase": phase,
+                    "pipeline.iteration": iteration,
+                },
+                KIND_CLIENT,
+            ):
+                if deadline is not None:
+                    if not deadline.remaining:
+                        LOGGER.warning("Turn deadline reached before calling xAI")
+                        raise HomeAssistantError(ERROR_GETTING_RESPONSE)
+                    request_kwargs["timeout"] = deadline.remaining
+
+                # Build messages from chat_log content using HA standard approach
+                with span("build_request"):
+                    request_kwargs["messages"] = self._build_openai_messages(
+                        chat_log, attachments
+                    )
+
+                stream = None
+                guard: StallGuard | None = None
+                stream_errors.clear()
+                breaker = self._client.breaker
+                # Tool calls of this request, timed until their results arrive
+                tool_spans: dict[str, Span] = {}
+                try:
+                    async with timeout_for(deadline):
+                        try:
+                            started = time.monotonic()
+                            started_ns = time.time_ns()
+                            with span("connect"):
+                                response = await self._client.async_create_chat_completion(
+                                    **request_kwargs
+                                )
+                            stream = guard = StallGuard(
+                                trace_stream(
+                                    record_call(phase, request_kwargs, response, started),
+                                    started_ns,
+                                ),
+                                deadline,
+                            )
+                        except (
+                            AuthenticationError,
+                            APIConnectionError,
+                            RateLimitError,
+                            BadRequestError,
+                            Exception,
+                        ) as err:
+                            LOGGER.error("Error calling xAI: %s", err)
+                            raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
+
+                        # Use HA's native streaming with our custom tag pipeline
+                        async for content in chat_log.async_add_delta_content_stream(
+                            self.entity_id,
+                            _coalesce_deltas(_transform_stream(stream, user_input)),
+                        ):
+                            trace_tool_content(content, tool_spans)
+                except TimeoutError as err:
+                    # Only a slow or stalled upstream is an outage for the breaker,
+                    # not time spent in tools or a handoff between chunks
+                    if stream is None or (guard is not None and guard.stalled):
+                        LOGGER.warning("xAI took too long to answer")
+                        if breaker is not None:
+                            breaker.record_failure()
+                    else:
+                        LOGGER.warning("Turn deadline reached while handling the answer")
+                    raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
+                except APIError as err:
+                    LOGGER.error("Error streaming from xAI: %s", err)
+                    if breaker is not None:
+                        breaker.record_failure()
+                    raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
+                finally:
+                    # Release the upstream connection on errors, deadline and caller cancellation
+                    if stream is not None:
+                        await stream.close()
+
+                # Streams only count as healthy once they completed
+                if breaker is not None:
+                    if stream_errors or (guard is not None and guard.stalled):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+
+                if not chat_log.unresponded_tool_results:
+                    break
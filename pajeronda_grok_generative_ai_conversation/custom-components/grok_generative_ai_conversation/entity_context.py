@@ -0,0 +1,263 @@
+"""Compact overview of the exposed entities for the LLM API prompt."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import groupby
+from typing import NamedTuple
+
+from homeassistant.components.homeassistant.exposed_entities import (
+    async_listen_entity_updates,
+    async_should_expose,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    COMPACT_CONTEXT_ATTRIBUTES,
+    COMPACT_CONTEXT_CHANGES_HEADER,
+    COMPACT_CONTEXT_HEADER,
+    COMPACT_CONTEXT_MAX_CONVERSATIONS,
+    COMPACT_CONTEXT_REBASE_RATIO,
+    ENTITY_OVERVIEW_MARKER,
+    LOGGER,
+)
+
+_NO_AREA = "No area"
+
+
+class EntityEntry(NamedTuple):
+    """What the model is told about one exposed entity."""
+
+    area: str
+    domain: str
+    name: str
+    state: str
+
+
+type Snapshot = dict[str, EntityEntry]
+
+
+class _Overview(NamedTuple):
+    """Snapshot sent in full at the start of a conversation."""
+
+    version: int
+    snapshot: Snapshot
+    text: str
+
+
+def _format_attribute(name: str, value: object) -> str:
+    """Format a state attribute as briefly as possible."""
+    if name == "brightness" and isinstance(value, (int, float)):
+        return f"{round(value / 255 * 100)}%"
+    if name == "volume_level" and isinstance(value, (int, float)):
+        return f"volume {round(value * 100)}%"
+    if name in ("current_position", "percentage", "humidity"):
+        return f"{value}%"
+    return f"{name.replace('_', ' ')} {value}"
+
+
+def compact_state(state: State) -> str:
+    """Return the state with only the attributes relevant to control it."""
+    parts = [state.state]
+    if unit := state.attributes.get("unit_of_measurement"):
+        parts[0] = f"{state.state} {unit}"
+    for name in COMPACT_CONTEXT_ATTRIBUTES.get(state.domain, ()):
+        if (value := state.attributes.get(name)) is not None:
+            parts.append(_format_attribute(name, value))
+    return ", ".join(parts)
+
+
+def encode_snapshot(snapshot: Snapshot) -> str:
+    """Encode entities grouped by area, then domain, one line per domain."""
+    lines = [COMPACT_CONTEXT_HEADER]
+    entries = sorted(snapshot.values())
+    for area, in_area in groupby(entries, key=lambda entry: entry.area):
+        lines.append(area)
+        for domain, in_domain in groupby(in_area, key=lambda entry: entry.domain):
+            lines.append(
+                f" {domain}: "
+                + "; ".join(f"{entry.name}: {entry.state}" for entry in in_domain)
+            )
+    return "\n".join(lines)
+
+
+def diff_snapshots(base: Snapshot, current: Snapshot) -> list[str]:
+    """Describe what changed between two snapshots."""
+    changes = []
+    for entity_id, entry in current.items():
+        if base.get(entity_id) != entry:
+            changes.append(f"{entry.area} {entry.domain} {entry.name}: {entry.state}")
+    for entity_id, entry in base.items():
+        if entity_id not in current:
+            changes.append(f"{entry.area} {entry.domain} {entry.name}: no longer exposed")
+    return changes
+
+
+def split_api_prompt(api_prompt: str) -> tuple[str, str] | None:
+    """Split the Assist API prompt into its instructions and entity overview."""
+    if (index := api_prompt.find(ENTITY_OVERVIEW_MARKER)) == -1:
+        return None
+    # The overview starts at the beginning of the marker line
+    start = api_prompt.rfind("\n", 0, index) + 1
+    return api_prompt[:start].rstrip("\n"), api_prompt[start:]
+
+
+class ExposedEntityContext:
+    """Compact overview of the exposed entities, kept up to date incrementally.
+
+    The snapshot is built once, then each state change of an exposed entity
+    updates its entry and bumps the version. Exposure and registry changes
+    drop the snapshot so it is rebuilt on the next turn. The overview is in
+    the prompt of every turn: a conversation keeps the one it started with,
+    byte for byte so the prompt cache serves it, followed by the changes since
+    then, until too many entities changed and it moves to a new overview.
+    Entities are listed by name rather than short ids, since that is how the
+    Assist tools address them.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the context."""
+        self.hass = hass
+        self.version = 0
+        self._snapshot: Snapshot | None = None
+        self._overview: _Overview | None = None
+        self._unsub_states: CALLBACK_TYPE | None = None
+        self._conversations: OrderedDict[str, _Overview] = OrderedDict()
+
+    @callback
+    def async_setup(self) -> CALLBACK_TYPE:
+        """Start listening for invalidating changes, returning the unsubscriber."""
+        unsubs = [
+            async_listen_entity_updates(self.hass, "conversation", self.async_invalidate),
+            *(
+                self.hass.bus.async_listen(event_type, self._async_handle_event)
+                for event_type in (
+                    er.EVENT_ENTITY_REGISTRY_UPDATED,
+                    dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                    ar.EVENT_AREA_REGISTRY_UPDATED,
+                )
+            ),
+        ]
+
+        @callback
+        def unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+            self.async_invalidate()
+            self._conversations.clear()
+
+        return unsubscribe
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        """Invalidate on registry updates."""
+        self.async_invalidate()
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Drop the snapshot, it is rebuilt on the next turn."""
+        if self._unsub_states is not None:
+            self._unsub_states()
+            self._unsub_states = None
+        if self._snapshot is not None:
+            LOGGER.debug("Exposure or areas changed, rebuilding entity overview")
+            self._snapshot = None
+            self.version += 1
+
+    @callback
+    def async_prompt(self, conversation_id: str) -> tuple[str, str]:
+        """Return the overview of a conversation and the changes since then."""
+        snapshot = self._async_snapshot()
+        overview = self._conversations.pop(conversation_id, None)
+        changes: list[str] = []
+        if overview is not None and overview.version != self.version:
+            changes = diff_snapshots(overview.snapshot, snapshot)
+            if len(changes) > len(snapshot) * COMPACT_CONTEXT_REBASE_RATIO:
+                overview = None
+                changes = []
+        if overview is None:
+            overview = self._async_current_overview(snapshot)
+        self._conversations[conversation_id] = overview
+        while len(self._conversations) > COMPACT_CONTEXT_MAX_CONVERSATIONS:
+            self._conversations.popitem(last=False)
+        return overview.text, (
+            f"{COMPACT_CONTEXT_CHANGES_HEADER} {'; '.join(changes) or 'none'}"
+        )
+
+    @callback
+    def _async_current_overview(self, snapshot: Snapshot) -> _Overview:
+        """Return the overview of the current version, encoding it once."""
+        if self._overview is None or self._overview.version != self.version:
+            self._overview = _Overview(
+                self.version, dict(snapshot), encode_snapshot(snapshot)
+            )
+        return self._overview
+
+    @callback
+    def _async_snapshot(self) -> Snapshot:
+        """Return the snapshot, building it and tracking its entities if needed."""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        entity_registry = er.async_get(self.hass)
+        device_registry = dr.async_get(self.hass)
+        area_registry = ar.async_get(self.hass)
+        areas: dict[str, str] = {}
+
+        snapshot: Snapshot = {}
+        for state in self.hass.states.async_all():
+            if not async_should_expose(self.hass, "conversation", state.entity_id):
+                continue
+            area_id = None
+            if (entity := entity_registry.async_get(state.entity_id)) is not None:
+                area_id = entity.area_id
+                if area_id is None and entity.device_id is not None:
+                    if device := device_registry.async_get(entity.device_id):
+                        area_id = device.area_id
+            area = _NO_AREA
+            if area_id is not None:
+                if area_id not in areas:
+                    area_entry = area_registry.async_get_area(area_id)
+                    areas[area_id] = area_entry.name if area_entry else _NO_AREA
+                area = areas[area_id]
+            snapshot[state.entity_id] = EntityEntry(
+                area, state.domain, state.name, compact_state(state)
+            )
+
+        self._snapshot = snapshot
+        self.version += 1
+        self._unsub_states = async_track_state_change_event(
+            self.hass, list(snapshot), self._async_handle_state_change
+        )
+        return snapshot
+
+    @callback
+    def _async_handle_state_change(self, event: Event[EventStateChangedData]) -> None:
+        """Update the entry of an exposed entity."""
+        if self._snapshot is None:
+            return
+        entity_id = event.data["entity_id"]
+        if (new_state := event.data["new_state"]) is None:
+            if self._snapshot.pop(entity_id, None) is not None:
+                self.version += 1
+            return
+        entry = self._snapshot.get(entity_id)
+        if entry is None:
+            return
+        updated = entry._replace(name=new_state.name, state=compact_state(new_state))
+        if updated != entry:
+            self._snapshot[entity_id] = updated
+            self.version += 1
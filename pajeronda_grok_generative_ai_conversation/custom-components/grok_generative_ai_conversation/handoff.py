@@ -0,0 +1,134 @@
+"""In-process handoff to a local conversation agent."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import replace
+import time
+from typing import Any
+
+from homeassistant.components import conversation
+from homeassistant.core import Context, HomeAssistant, callback
+from homeassistant.helpers import intent
+
+from .const import DEFAULT_LOCAL_AGENT, DOMAIN, LOGGER
+
+
+class LocalAgentHandoff:
+    """Resolve local agents once and call them without the service bus.
+
+    The built-in agent loads the intents of a language on first use, which
+    makes the first handoff slow. Preparing it in the background ahead of time
+    avoids that. A handoff arriving while its language is still being prepared
+    waits for the preparation instead of loading the intents a second time,
+    bounded by the deadline of the turn.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the handoff layer."""
+        self.hass = hass
+        self._agents: dict[str, Any] = {}
+        self._prepared: set[str] = set()
+        self._preparing: dict[str, asyncio.Task[None]] = {}
+
+    @callback
+    def async_prepare(self, languages: Iterable[str]) -> None:
+        """Prepare the default local agent for languages not prepared yet."""
+        for language in languages:
+            if language in self._prepared or language in self._preparing:
+                continue
+            self._preparing[language] = self.hass.async_create_background_task(
+                self._async_prepare(language),
+                f"{DOMAIN} prepare local agent {language}",
+            )
+
+    async def _async_prepare(self, language: str) -> None:
+        """Load the intents of the default local agent for a language."""
+        started = time.monotonic()
+        try:
+            await conversation.async_prepare_agent(
+                self.hass, DEFAULT_LOCAL_AGENT, language
+            )
+        except Exception as err:  # The agent is then prepared on first use
+            LOGGER.warning("Preparing local agent for %s failed: %s", language, err)
+        else:
+            self._prepared.add(language)
+            LOGGER.debug(
+                "Prepared local agent for %s in %.2f s",
+                language,
+                time.monotonic() - started,
+            )
+        finally:
+            self._preparing.pop(language, None)
+
+    async def _async_wait_prepared(self, language: str) -> None:
+        """Wait for a running preparation of the default agent for a language."""
+        if (task := self._preparing.get(language)) is not None:
+            LOGGER.debug("Waiting for the local agent to prepare %s", language)
+            # Shielded, a turn running out of time must not cancel the preparation
+            await asyncio.shield(task)
+
+    def _async_get_agent(self, agent_id: str) -> Any:
+        """Return the agent for an id, resolving it on first use."""
+        if (agent := self._agents.get(agent_id)) is None:
+            agent = conversation.async_get_agent(self.hass, agent_id)
+            if agent is not None:
+                self._agents[agent_id] = agent
+        return agent
+
+    async def async_process(
+        self,
+        text: str,
+        agent_id: str,
+        language: str,
+        user_input: conversation.ConversationInput | None,
+    ) -> conversation.ConversationResult | None:
+        """Process text with a local agent, returning None if it is unavailable."""
+        if agent_id == DEFAULT_LOCAL_AGENT:
+            await self._async_wait_prepared(language)
+
+        agent = self._async_get_agent(agent_id)
+        if agent is None:
+            LOGGER.warning("Local agent %s not found", agent_id)
+            return None
+
+        # Keep the device, satellite and context of the original turn so the
+        # local agent can match against the satellite area. The conversation id
+        # is not reused: the local agent would write into the chat log of the
+        # turn that is still streaming.
+        if user_input is not None:
+            handoff_input = replace(
+                user_input,
+                text=text,
+                conversation_id=None,
+                language=language,
+                agent_id=agent_id,
+                extra_system_prompt=None,
+            )
+        else:
+            handoff_input = conversation.ConversationInput(
+                text=text,
+                context=Context(),
+                conversation_id=None,
+                device_id=None,
+                language=language,
+                agent_id=agent_id,
+            )
+
+        try:
+            if isinstance(agent, conversation.ConversationEntity):
+                agent.async_set_context(handoff_input.context)
+                return await agent.internal_async_process(handoff_input)
+            return await agent.async_process(handoff_input)
+        except Exception:
+            # The agent may have been reloaded, resolve it again next time
+            self._agents.pop(agent_id, None)
+            raise
+
+
+def speech_from_result(result: conversation.ConversationResult | None) -> str | None:
+    """Return the plain speech of a successful result."""
+    if result is None or result.response.response_type == intent.IntentResponseType.ERROR:
+        return None
+    return result.response.speech.get("plain", {}).get("speech") or None
@@ -0,0 +1,148 @@
+"""Background jobs for the generate_content service."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import StrEnum
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.ulid import ulid_now
+
+from .const import (
+    DOMAIN,
+    EVENT_JOB_FINISHED,
+    JOB_MAX_PENDING,
+    JOB_MAX_RESULTS,
+    JOB_RESULT_TTL,
+    JOB_WORKERS,
+    LOGGER,
+)
+
+
+class JobStatus(StrEnum):
+    """Status of a job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    ERROR = "error"
+
+
+@dataclass(slots=True)
+class Job:
+    """A generation submitted in the background."""
+
+    job_id: str
+    submitted: float = field(default_factory=time.time)
+    status: JobStatus = JobStatus.PENDING
+    finished: float | None = None
+    text: str | None = None
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the job as a service response."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "submitted": self.submitted,
+            "finished": self.finished,
+            "text": self.text,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Run generations on a bounded set of workers and keep their results.
+
+    At most JOB_WORKERS jobs run at once, the others wait for a free worker.
+    Finished jobs fire EVENT_JOB_FINISHED and are kept for JOB_RESULT_TTL
+    seconds, up to JOB_MAX_RESULTS of them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        workers: int = JOB_WORKERS,
+        max_pending: int = JOB_MAX_PENDING,
+    ) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self.max_pending = max_pending
+        self._workers = asyncio.Semaphore(workers)
+        self._jobs: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @callback
+    def async_submit(self, factory: Callable[[], Awaitable[str]]) -> Job:
+        """Queue a generation, returning its job at once."""
+        self._async_purge()
+        if len(self._tasks) >= self.max_pending:
+            raise HomeAssistantError(
+                f"Too many background jobs, {self.max_pending} are already queued"
+            )
+        job = Job(job_id=ulid_now())
+        self._jobs[job.job_id] = job
+        task = self.hass.async_create_background_task(
+            self._async_run(job, factory), f"{DOMAIN} job {job.job_id}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    @callback
+    def async_get(self, job_id: str) -> Job:
+        """Return a job."""
+        self._async_purge()
+        if (job := self._jobs.get(job_id)) is None:
+            raise HomeAssistantError(f"Unknown or expired job {job_id}")
+        return job
+
+    async def _async_run(self, job: Job, factory: Callable[[], Awaitable[str]]) -> None:
+        """Run a job on a free worker and announce its result."""
+        async with self._workers:
+            job.status = JobStatus.RUNNING
+            try:
+                job.text = await factory()
+            except Exception as err:  # Reported through the job, not raised
+                LOGGER.warning("Background job %s failed: %s", job.job_id, err)
+                job.status = JobStatus.ERROR
+                job.error = str(err)
+            else:
+                job.status = JobStatus.DONE
+        job.finished = time.time()
+        self._async_purge()
+        self.hass.bus.async_fire(
+            EVENT_JOB_FINISHED,
+            {
+                "job_id": job.job_id,
+                "status": job.status,
+                "text": job.text,
+                "error": job.error,
+            },
+        )
+
+    @callback
+    def _async_purge(self) -> None:
+        """Drop expired results and the oldest ones beyond the limit."""
+        now = time.time()
+        expired: list[str] = []
+        kept: list[str] = []
+        for job in self._jobs.values():
+            if job.finished is not None:
+                (expired if now - job.finished > JOB_RESULT_TTL else kept).append(
+                    job.job_id
+                )
+        # Jobs are kept in submission order, drop the oldest first
+        for job_id in expired + kept[: max(0, len(kept) - JOB_MAX_RESULTS)]:
+            del self._jobs[job_id]
+
+    async def async_shutdown(self) -> None:
+        """Cancel the jobs that are still queued or running."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,85 @@
+"""Cache of Assist API instances for the tools fallback."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+from homeassistant.components.homeassistant.exposed_entities import (
+    async_listen_entity_updates,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    floor_registry as fr,
+    llm,
+)
+
+from .const import ASSIST_API_CACHE_SIZE, LOGGER
+
+
+class AssistAPICache:
+    """Keep built Assist API instances until entity exposure or areas change.
+
+    Building the Assist API renders the prompt with every exposed entity and
+    area and converts all tool schemas, which is the same for every fallback
+    from the same device and language.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._instances: dict[tuple[str | None, ...], llm.APIInstance] = {}
+
+    @callback
+    def async_setup(self) -> CALLBACK_TYPE:
+        """Start listening for invalidating changes, returning the unsubscriber."""
+        unsubs = [
+            async_listen_entity_updates(self.hass, "conversation", self.async_invalidate),
+            *(
+                self.hass.bus.async_listen(event_type, self._async_handle_event)
+                for event_type in (
+                    er.EVENT_ENTITY_REGISTRY_UPDATED,
+                    dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                    ar.EVENT_AREA_REGISTRY_UPDATED,
+                    fr.EVENT_FLOOR_REGISTRY_UPDATED,
+                )
+            ),
+        ]
+
+        @callback
+        def unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+            self._instances.clear()
+
+        return unsubscribe
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        """Invalidate on registry updates."""
+        self.async_invalidate()
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Forget all cached instances."""
+        if self._instances:
+            LOGGER.debug("Exposure or areas changed, dropping cached Assist API")
+            self._instances.clear()
+
+    async def async_get(self, llm_context: llm.LLMContext) -> llm.APIInstance:
+        """Return an Assist API instance bound to this LLM context."""
+        key = (
+            llm_context.platform,
+            llm_context.language,
+            llm_context.assistant,
+            llm_context.device_id,
+        )
+        if (instance := self._instances.get(key)) is None:
+            instance = await llm.async_get_api(self.hass, llm.LLM_API_ASSIST, llm_context)
+            if len(self._instances) >= ASSIST_API_CACHE_SIZE:
+                self._instances.clear()
+            self._instances[key] = instance
+        # Tools must run with the context (user, ids) of the current turn
+        return replace(instance, llm_context=llm_context)
@@ -0,0 +1,81 @@
+"""Incremental conversion of chat log content to OpenAI messages."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+import weakref
+
+from homeassistant.components import conversation
+
+
+class _ConvertedLog:
+    """Messages converted so far for one conversation."""
+
+    __slots__ = ("owner", "contents", "messages")
+
+    def __init__(self, chat_log: conversation.ChatLog) -> None:
+        """Start with the system content, which is converted on every turn."""
+        self.owner = weakref.ref(chat_log)
+        self.contents: list[Any] = [chat_log.content[0]]
+        # (content, message) for each content that converts to a message
+        self.messages: list[tuple[Any, dict[str, Any]]] = []
+
+
+class MessageCache:
+    """Append-only cache of converted messages per conversation id.
+
+    Chat log content only grows during a session, so each turn converts the
+    content added since the previous turn and reuses the earlier message dicts,
+    which keeps the request prefix stable. The system content is replaced on
+    every turn and always converted again. An entry is dropped once the last
+    chat log of its conversation is garbage collected, which happens when the
+    chat session ends.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._logs: dict[str, _ConvertedLog] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached conversations."""
+        return len(self._logs)
+
+    def messages(
+        self,
+        chat_log: conversation.ChatLog,
+        convert: Callable[[Any], dict[str, Any] | None],
+    ) -> list[tuple[Any, dict[str, Any]]]:
+        """Return (content, message) pairs for the chat log, system first."""
+        content = chat_log.content
+        converted = self._logs.get(chat_log.conversation_id)
+        if converted is None or not self._extends(converted, content):
+            converted = self._logs[chat_log.conversation_id] = _ConvertedLog(chat_log)
+            weakref.finalize(chat_log, self._evict, chat_log.conversation_id)
+        elif converted.owner() is not chat_log:
+            # A new copy of the chat log is used on every turn, follow the latest
+            converted.owner = weakref.ref(chat_log)
+            weakref.finalize(chat_log, self._evict, chat_log.conversation_id)
+
+        for item in content[len(converted.contents) :]:
+            converted.contents.append(item)
+            if (message := convert(item)) is not None:
+                converted.messages.append((item, message))
+
+        if (system := convert(content[0])) is None:
+            return list(converted.messages)
+        return [(content[0], system), *converted.messages]
+
+    @staticmethod
+    def _extends(converted: _ConvertedLog, content: list[Any]) -> bool:
+        """Return True if the content continues what was converted."""
+        known = len(converted.contents)
+        return len(content) >= known and (
+            known == 1 or content[known - 1] is converted.contents[-1]
+        )
+
+    def _evict(self, conversation_id: str) -> None:
+        """Drop a conversation once its latest chat log is gone."""
+        converted = self._logs.get(conversation_id)
+        if converted is not None and converted.owner() is None:
+            del self._logs[conversation_id]
@@ -0,0 +1,120 @@
+"""Per-phase model profiles for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    CONF_CHAT_MODEL,
+    CONF_MAX_TOKENS,
+    CONF_REASONING_EFFORT,
+    CONF_STOP,
+    CONF_TEMPERATURE,
+    CONF_TOP_P,
+    MAX_STOP_SEQUENCES,
+    REASONING_EFFORT_DEFAULT,
+    REASONING_EFFORT_MODELS,
+    RECOMMENDED_CHAT_MODEL,
+    RECOMMENDED_MAX_TOKENS,
+    RECOMMENDED_PHASE_PROFILES,
+    RECOMMENDED_TEMPERATURE,
+    RECOMMENDED_TOP_P,
+)
+
+_BASE_DEFAULTS: dict[str, Any] = {
+    CONF_CHAT_MODEL: RECOMMENDED_CHAT_MODEL,
+    CONF_TEMPERATURE: RECOMMENDED_TEMPERATURE,
+    CONF_TOP_P: RECOMMENDED_TOP_P,
+    CONF_MAX_TOKENS: RECOMMENDED_MAX_TOKENS,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ModelProfile:
+    """Request parameters used for one phase of the pipeline."""
+
+    model: str
+    temperature: float
+    top_p: float
+    max_tokens: int
+    reasoning_effort: str | None = None
+    stop: tuple[str, ...] = ()
+
+    def as_request_kwargs(self) -> dict[str, Any]:
+        """Return the chat completion arguments for this profile."""
+        kwargs: dict[str, Any] = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "max_tokens": self.max_tokens,
+        }
+        # Only reasoning models accept reasoning_effort, so never send a default
+        if self.reasoning_effort:
+            kwargs["reasoning_effort"] = self.reasoning_effort
+        if self.stop:
+            kwargs["stop"] = list(self.stop)
+        return kwargs
+
+
+def parse_stop_sequences(value: Any) -> tuple[str, ...]:
+    """Parse stop sequences from a multiline string or a list."""
+    if isinstance(value, str):
+        items = value.splitlines()
+    elif isinstance(value, (list, tuple)):
+        items = [str(item) for item in value]
+    else:
+        return ()
+    # Escaped newlines let users stop on line breaks from a single-line field
+    stops = [item.replace("\\n", "\n") for item in items if item.strip()]
+    return tuple(stops[:MAX_STOP_SEQUENCES])
+
+
+def resolve_profile(phase: str, *sources: Mapping[str, Any]) -> ModelProfile:
+    """Resolve the profile for a phase.
+
+    Sources are checked in priority order. Phase specific values win over the
+    recommended phase defaults, which in turn win over the shared settings.
+    A recommended reasoning effort is dropped for models not accepting it.
+    """
+    phase_options: Mapping[str, Any] = {}
+    for source in sources:
+        value = source.get(phase)
+        if isinstance(value, Mapping):
+            phase_options = value
+            break
+
+    recommended = RECOMMENDED_PHASE_PROFILES.get(phase, {})
+
+    def pick(key: str) -> Any:
+        value = phase_options.get(key)
+        if value not in (None, ""):
+            return value
+        if key in recommended:
+            return recommended[key]
+        for source in sources:
+            value = source.get(key)
+            if value not in (None, ""):
+                return value
+        return _BASE_DEFAULTS.get(key)
+
+    model = str(pick(CONF_CHAT_MODEL))
+    effort = pick(CONF_REASONING_EFFORT)
+    if not isinstance(effort, str) or effort in ("", REASONING_EFFORT_DEFAULT):
+        effort = None
+    elif (
+        phase_options.get(CONF_REASONING_EFFORT) in (None, "")
+        and recommended.get(CONF_REASONING_EFFORT) == effort
+        and not model.startswith(REASONING_EFFORT_MODELS)
+    ):
+        effort = None
+
+    return ModelProfile(
+        model=model,
+        temperature=float(pick(CONF_TEMPERATURE)),
+        top_p=float(pick(CONF_TOP_P)),
+        max_tokens=int(pick(CONF_MAX_TOKENS)),
+        reasoning_effort=effort,
+        stop=parse_stop_sequences(pick(CONF_STOP)),
+    )
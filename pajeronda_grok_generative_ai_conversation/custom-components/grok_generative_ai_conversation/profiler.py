@@ -0,0 +1,168 @@
+"""On-demand profiling of conversation turns."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+import os
+import pstats
+from typing import Any, ContextManager
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER, PROFILE_TOP_FUNCTIONS
+
+_PACKAGE_DIR = os.path.dirname(__file__)
+
+
+def _function_stats(
+    stats: pstats.Stats, functions: list[tuple[str, int, str]]
+) -> list[dict[str, Any]]:
+    """Describe profiled functions."""
+    result = []
+    for func in functions:
+        _, calls, total, cumulative, _ = stats.stats[func]  # type: ignore[attr-defined]
+        filename, line, name = func
+        result.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "total": round(total, 4),
+                "cumulative": round(cumulative, 4),
+            }
+        )
+    return result
+
+
+def _write_stats(profile: cProfile.Profile, path: str) -> dict[str, Any]:
+    """Dump the profile as a pstats file and summarize it (executor)."""
+    profile.dump_stats(path)
+    stats = pstats.Stats(path).sort_stats(pstats.SortKey.CUMULATIVE)
+    functions = stats.fcn_list  # type: ignore[attr-defined]
+    return {
+        "file": path,
+        "total_time": round(stats.total_tt, 4),  # type: ignore[attr-defined]
+        "top": _function_stats(stats, functions[:PROFILE_TOP_FUNCTIONS]),
+        "integration": _function_stats(
+            stats,
+            [func for func in functions if func[0].startswith(_PACKAGE_DIR)][
+                :PROFILE_TOP_FUNCTIONS
+            ],
+        ),
+    }
+
+
+class TurnProfiler:
+    """Profile the next conversation turns with cProfile.
+
+    The profiler is enabled on the event loop while at least one turn is in
+    progress, so the numbers include other work the loop runs meanwhile. When
+    no profile is requested a turn only pays for one attribute check.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self._profile: cProfile.Profile | None = None
+        self._active_turns = 0
+        self._remaining_turns = 0
+        self._done: asyncio.Future[None] | None = None
+        self._unsub_timeout: CALLBACK_TYPE | None = None
+
+    async def async_run(self, turns: int, duration: float) -> dict[str, Any]:
+        """Profile the next turns, or as many as happen within the duration."""
+        if self._profile is not None:
+            raise HomeAssistantError("A profile is already running")
+
+        profile = cProfile.Profile()
+        try:
+            # Only one profiler can be active at a time (profiler integration,
+            # sys.monitoring tools), find out now rather than during a turn
+            profile.enable()
+            profile.disable()
+        except ValueError as err:
+            raise HomeAssistantError(
+                f"Cannot profile, another profiler is active: {err}"
+            ) from err
+        self._profile = profile
+        self._remaining_turns = turns
+        self._done = self.hass.loop.create_future()
+        self._unsub_timeout = async_call_later(
+            self.hass, duration, self._async_handle_timeout
+        )
+        profiled_turns = turns
+        try:
+            await self._done
+            profiled_turns = turns - max(self._remaining_turns, 0)
+        finally:
+            self._async_stop()
+
+        if not profiled_turns:
+            return {"turns": 0}
+
+        path = self.hass.config.path(
+            f"{DOMAIN}_profile_{dt_util.utcnow():%Y%m%d_%H%M%S}.pstats"
+        )
+        LOGGER.info("Writing profile of %d turns to %s", profiled_turns, path)
+        summary = await self.hass.async_add_executor_job(_write_stats, profile, path)
+        return {"turns": profiled_turns, **summary}
+
+    def turn(self) -> ContextManager[None]:
+        """Profile the turn handled inside the context, if a profile is running."""
+        if self._profile is None:
+            return nullcontext()
+        return self._profiled_turn(self._profile)
+
+    @contextmanager
+    def _profiled_turn(self, profile: cProfile.Profile) -> Iterator[None]:
+        """Enable the profiler for the first concurrent turn."""
+        if self._active_turns == 0:
+            try:
+                profile.enable()
+            except ValueError as err:
+                # Another profiler started meanwhile, never fail the turn for it
+                LOGGER.warning(
+                    "Cannot profile turn, another profiler is active: %s", err
+                )
+                yield
+                return
+        self._active_turns += 1
+        try:
+            yield
+        finally:
+            if profile is self._profile:
+                self._active_turns -= 1
+                if self._active_turns == 0:
+                    profile.disable()
+                self._remaining_turns -= 1
+                if self._remaining_turns <= 0:
+                    self._async_finish()
+
+    @callback
+    def _async_handle_timeout(self, _now: object) -> None:
+        """Stop profiling once the duration has passed."""
+        self._unsub_timeout = None
+        self._async_finish()
+
+    @callback
+    def _async_finish(self) -> None:
+        """Wake up the waiting service call."""
+        if self._done is not None and not self._done.done():
+            self._done.set_result(None)
+
+    @callback
+    def _async_stop(self) -> None:
+        """Disable the profiler and forget the profile."""
+        if self._unsub_timeout is not None:
+            self._unsub_timeout()
+            self._unsub_timeout = None
+        if self._profile is not None and self._active_turns:
+            self._profile.disable()
+        self._profile = None
+        self._active_turns = 0
+        self._done = None
@@ -0,0 +1,80 @@
+"""Cache friendly layout of the messages sent to xAI."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components import conversation
+from homeassistant.helpers import llm
+
+from .const import COMPACT_CONTEXT_CHANGES_HEADER
+
+# Home Assistant starts every system prompt with the current time
+_TIME_PROMPT = getattr(llm, "BASE_PROMPT", "")
+_TIME_PROMPT_HEAD = _TIME_PROMPT.split("{{", 1)[0]
+_TIME_PROMPT_LINES = _TIME_PROMPT.count("\n")
+
+
+def split_system_prompt(
+    system: str, api_prompt: str | None, extra_system_prompt: str | None
+) -> tuple[str, list[str]]:
+    """Split a system prompt into its stable part and its volatile context.
+
+    The time line Home Assistant puts first, the API prompt (with the exposed
+    entities and their states) and the extra system prompt of the caller change
+    between turns, the router prompt and the user instructions do not. With
+    the compact entity context only the changes after the entity overview are
+    volatile, the overview itself stays the same for the whole conversation.
+    """
+    stable = system
+    time_context = None
+    if _TIME_PROMPT_LINES and _TIME_PROMPT_HEAD and stable.startswith(_TIME_PROMPT_HEAD):
+        lines = stable.split("\n", _TIME_PROMPT_LINES)
+        time_context = "\n".join(lines[:_TIME_PROMPT_LINES])
+        stable = lines[_TIME_PROMPT_LINES] if len(lines) > _TIME_PROMPT_LINES else ""
+
+    # Appended in this order after the prompt, so removed in reverse
+    suffixes = []
+    for part in (extra_system_prompt, api_prompt):
+        if part and stable.endswith(part):
+            stable = stable[: -len(part)].rstrip("\n")
+            suffixes.insert(0, part)
+
+    stable, found, changes = stable.partition(f"\n{COMPACT_CONTEXT_CHANGES_HEADER}")
+    if found:
+        suffixes.insert(0, f"{COMPACT_CONTEXT_CHANGES_HEADER}{changes}")
+
+    volatile = [part for part in (time_context, *suffixes) if part]
+    return stable, volatile
+
+
+def layout_messages(
+    messages: list[dict[str, Any]], chat_log: conversation.ChatLog
+) -> list[dict[str, Any]]:
+    """Order messages so the request starts with a byte stable prefix.
+
+    The stable system prompt comes first, followed by the history, so every
+    turn shares the prefix of the previous one. The volatile context is sent
+    as a system message right before the newest user message.
+    """
+    if not messages or messages[0]["role"] != "system":
+        return messages
+    stable, volatile = split_system_prompt(
+        messages[0]["content"],
+        chat_log.llm_api.api_prompt if chat_log.llm_api else None,
+        getattr(chat_log, "extra_system_prompt", None),
+    )
+    if not volatile:
+        return messages
+
+    laid_out = [{"role": "system", "content": stable}, *messages[1:]]
+    position = next(
+        (
+            index
+            for index in range(len(laid_out) - 1, 0, -1)
+            if laid_out[index]["role"] == "user"
+        ),
+        len(laid_out),
+    )
+    laid_out.insert(position, {"role": "system", "content": "\n".join(volatile)})
+    return laid_out
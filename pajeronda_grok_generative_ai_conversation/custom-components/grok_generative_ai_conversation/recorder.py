@@ -0,0 +1,257 @@
+"""Opt-in recorder of conversation traffic, for offline replay."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, ContextManager
+
+from homeassistant.components import conversation
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, LOGGER, RECORDER_BACKUP_COUNT, RECORDER_MAX_BYTES
+
+# The turn being recorded by the current task, None when recording is off
+_TURN: ContextVar[dict[str, Any] | None] = ContextVar(
+    f"{DOMAIN}_recorded_turn", default=None
+)
+
+
+def _dump_event(event: Any) -> dict[str, Any]:
+    """Return the parts of a stream chunk the pipeline reads."""
+    if hasattr(event, "model_dump"):
+        return event.model_dump(
+            include={"choices", "usage"}, exclude_none=True, exclude_unset=True
+        )
+    return event
+
+
+class RecordedStream:
+    """Stream wrapper storing every chunk with its offset from the request."""
+
+    def __init__(self, stream: Any, call: dict[str, Any], started: float) -> None:
+        """Initialize the wrapper."""
+        self._stream = stream
+        self._call = call
+        self._started = started
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Yield the chunks of the wrapped stream."""
+        events = self._call["events"]
+        async for event in self._stream:
+            events.append(
+                [round((time.monotonic() - self._started) * 1000), _dump_event(event)]
+            )
+            yield event
+
+    async def close(self) -> None:
+        """Close the wrapped stream."""
+        await self._stream.close()
+
+
+def _digest(value: Any) -> str:
+    """Return a short hash identifying a large request part."""
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+
+
+def _compact_message(message: dict[str, Any]) -> dict[str, Any]:
+    """Return a message with its images replaced by their hash."""
+    content = message.get("content")
+    if not isinstance(content, list):
+        return message
+    return {
+        **message,
+        "content": [
+            {"type": "image_url", "digest": _digest(part.get("image_url"))}
+            if part.get("type") == "image_url"
+            else part
+            for part in content
+        ],
+    }
+
+
+def _compact_request(request_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Return what a record keeps of a request.
+
+    The history is rebuilt from the earlier turns of the conversation, so only
+    the messages from the newest user message on are kept. The system prompt
+    and the tools are identified by their hash and images by the hash of
+    their data.
+    """
+    messages: list[dict[str, Any]] = request_kwargs.get("messages") or []
+    newest_user = max(
+        (index for index, message in enumerate(messages) if message["role"] == "user"),
+        default=len(messages),
+    )
+    request = {
+        key: value
+        for key, value in request_kwargs.items()
+        if key not in ("timeout", "messages", "tools", "extra_headers")
+    }
+    if messages and messages[0]["role"] == "system":
+        request["prompt"] = _digest(messages[0]["content"])
+    if tools := request_kwargs.get("tools"):
+        request["tools"] = _digest(tools)
+    request["messages"] = [
+        _compact_message(message) for message in messages[newest_user:]
+    ]
+    return request
+
+
+def record_call(
+    phase: str, request_kwargs: dict[str, Any], stream: Any, started: float
+) -> Any:
+    """Record an upstream call of the current turn, returning the stream to read."""
+    if (turn := _TURN.get()) is None:
+        return stream
+    call = {
+        "phase": phase,
+        "request": _compact_request(request_kwargs),
+        "events": [],
+    }
+    turn["calls"].append(call)
+    return RecordedStream(stream, call, started)
+
+
+def record_outcome(key: str, value: Any) -> None:
+    """Record the outcome of a phase (Assist, fallback) of the current turn."""
+    if (turn := _TURN.get()) is not None:
+        turn[key] = value
+
+
+class RotatingFile:
+    """JSON lines appended in the executor to a file rotated once full."""
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, max_bytes: int, backup_count: int
+    ) -> None:
+        """Initialize the file."""
+        self.hass = hass
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+
+    @callback
+    def async_append(self, record: dict[str, Any]) -> None:
+        """Append a record in the executor."""
+        try:
+            line = json.dumps(record, separators=(",", ":"), default=str)
+        except (TypeError, ValueError) as err:
+            LOGGER.warning("Cannot serialize record for %s: %s", self.path, err)
+            return
+        self.hass.async_add_executor_job(self._write, line)
+
+    def _write(self, line: str) -> None:
+        """Append a line, rotating the file when it is full (executor)."""
+        with self._lock:
+            try:
+                if (
+                    os.path.exists(self.path)
+                    and os.path.getsize(self.path) + len(line) > self.max_bytes
+                ):
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(line + "\n")
+            except OSError as err:
+                LOGGER.warning("Cannot write %s: %s", self.path, err)
+
+    def _rotate(self) -> None:
+        """Shift path.1 to path.2 and so on, dropping the oldest file."""
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class TrafficRecorder:
+    """Append conversation turns to a rotated JSONL file.
+
+    A record holds the input, what every upstream request adds to the
+    conversation with its streamed chunks and their timings, and the Assist
+    and fallback outcomes. Records contain what users say, so recording is
+    opt-in.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        max_bytes: int = RECORDER_MAX_BYTES,
+        backup_count: int = RECORDER_BACKUP_COUNT,
+    ) -> None:
+        """Initialize the recorder."""
+        self._file = RotatingFile(hass, path, max_bytes, backup_count)
+
+    @contextmanager
+    def async_record_turn(
+        self, user_input: conversation.ConversationInput, conversation_id: str
+    ) -> Iterator[dict[str, Any]]:
+        """Record the turn handled inside the context."""
+        turn: dict[str, Any] = {
+            "time": time.time(),
+            "conversation_id": conversation_id,
+            "text": user_input.text,
+            "language": user_input.language,
+            "calls": [],
+        }
+        token = _TURN.set(turn)
+        started = time.monotonic()
+        try:
+            yield turn
+        finally:
+            _TURN.reset(token)
+            turn["duration"] = round((time.monotonic() - started) * 1000)
+            self._file.async_append(turn)
+
+
+def record_turn(
+    recorder: TrafficRecorder | None,
+    user_input: conversation.ConversationInput,
+    conversation_id: str,
+) -> ContextManager[dict[str, Any] | None]:
+    """Record a turn if recording is enabled."""
+    if recorder is None:
+        return nullcontext()
+    return recorder.async_record_turn(user_input, conversation_id)
+
+
+def read_recording(path: str, limit: int) -> list[dict[str, Any]]:
+    """Return the last recorded turns of a recording file (executor).
+
+    Each turn gets the text and speech of the earlier turns of its
+    conversation as history, since records only hold what a turn adds.
+    """
+    turns: list[dict[str, Any]] = []
+    # Earlier turns of each conversation, a turn remembers how many it follows
+    histories: dict[str, list[list[str | None]]] = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                turn = json.loads(line)
+            except json.JSONDecodeError:
+                LOGGER.debug("Skipping malformed recording line")
+                continue
+            history = histories.setdefault(turn.get("conversation_id") or "", [])
+            turn["history"] = len(history)
+            if turn.get("conversation_id"):
+                history.append([turn.get("text"), turn.get("speech")])
+            turns.append(turn)
+    turns = turns[-limit:] if limit else turns
+    for turn in turns:
+        turn["history"] = histories[turn.get("conversation_id") or ""][
+            : turn["history"]
+        ]
+    return turns
@@ -0,0 +1,215 @@
+"""Replay of recorded conversation traffic against a stand-in client."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.components import conversation
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import intent
+from homeassistant.util.ulid import ulid_now
+
+from .const import DOMAIN, LOGGER, PHASE_FALLBACK
+from .conversation import GrokGenerativeAIConversationEntity
+from .usage import UsageStats
+
+
+def _as_namespace(value: Any) -> Any:
+    """Turn recorded JSON back into objects with attribute access."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _as_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_as_namespace(item) for item in value]
+    return value
+
+
+def _as_event(data: dict[str, Any]) -> SimpleNamespace:
+    """Rebuild a stream chunk, with the attributes the pipeline reads."""
+    event = _as_namespace(data)
+    for choice in getattr(event, "choices", None) or []:
+        delta = getattr(choice, "delta", None) or SimpleNamespace()
+        for attr in ("content", "tool_calls"):
+            if not hasattr(delta, attr):
+                setattr(delta, attr, None)
+        for tool_call in delta.tool_calls or []:
+            for attr in ("id", "function"):
+                if not hasattr(tool_call, attr):
+                    setattr(tool_call, attr, None)
+            if tool_call.function is not None:
+                for attr in ("name", "arguments"):
+                    if not hasattr(tool_call.function, attr):
+                        setattr(tool_call.function, attr, None)
+        choice.delta = delta
+    return event
+
+
+class ReplayStream:
+    """Stream of recorded chunks, reproducing their original timing."""
+
+    def __init__(self, events: list[list[Any]], speed: float) -> None:
+        """Initialize the stream."""
+        self._events = events
+        self._speed = speed
+
+    async def __aiter__(self) -> AsyncIterator[SimpleNamespace]:
+        """Yield the recorded chunks."""
+        started = time.monotonic()
+        for offset, data in self._events:
+            if self._speed:
+                delay = offset / 1000 / self._speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield _as_event(data)
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+class ReplayClient:
+    """Stand-in for the client pool serving the recorded calls in order."""
+
+    # Replayed turns never count towards the health of xAI
+    breaker = None
+
+    def __init__(self, calls: list[dict[str, Any]], speed: float) -> None:
+        """Initialize the client."""
+        self._calls = list(calls)
+        self._speed = speed
+
+    async def async_create_chat_completion(self, **kwargs: Any) -> ReplayStream:
+        """Return the next recorded stream."""
+        if not self._calls:
+            raise RuntimeError("No more recorded calls for this turn")
+        return ReplayStream(self._calls.pop(0)["events"], self._speed)
+
+
+class ReplayHandoff:
+    """Stand-in for the local agents answering with the recorded speech."""
+
+    def __init__(self, hass: HomeAssistant, speech: str | None) -> None:
+        """Initialize the handoff."""
+        self.hass = hass
+        self._speech = speech
+
+    async def async_process(
+        self,
+        text: str,
+        agent_id: str,
+        language: str,
+        user_input: conversation.ConversationInput | None,
+    ) -> conversation.ConversationResult | None:
+        """Return the recorded Assist answer."""
+        if self._speech is None:
+            return None
+        response = intent.IntentResponse(language=language)
+        response.async_set_speech(self._speech)
+        return conversation.ConversationResult(response=response)
+
+
+class ReplayConversationEntity(GrokGenerativeAIConversationEntity):
+    """Conversation entity running a recorded turn without side effects.
+
+    Upstream calls come from the recording and Assist and the tools fallback
+    answer with their recorded outcome, so no device is ever controlled.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: Any,
+        subentry: ConfigSubentry,
+        turn: dict[str, Any],
+        speed: float,
+    ) -> None:
+        """Initialize the entity for one recorded turn."""
+        super().__init__(entry, subentry)
+        self.hass = hass
+        self.entity_id = f"conversation.{DOMAIN}_replay"
+        self._turn = turn
+        self._client = ReplayClient(
+            [call for call in turn["calls"] if call["phase"] != PHASE_FALLBACK],
+            speed,
+        )
+        assist = turn.get("assist") or {}
+        self._local_handoff = ReplayHandoff(hass, assist.get("speech"))
+        # Keep replayed usage out of the live statistics
+        self._usage = UsageStats()
+
+    async def async_fallback_with_tools(self, *args: Any, **kwargs: Any) -> str | None:
+        """Return the recorded fallback answer."""
+        return self._turn.get("fallback")
+
+
+async def async_replay_turn(
+    hass: HomeAssistant,
+    entry: Any,
+    subentry: ConfigSubentry,
+    turn: dict[str, Any],
+    speed: float,
+) -> dict[str, Any]:
+    """Replay one recorded turn and compare it with the recording."""
+    entity = ReplayConversationEntity(hass, entry, subentry, turn, speed)
+    conversation_id = f"replay_{ulid_now()}"
+    user_input = conversation.ConversationInput(
+        text=turn["text"],
+        context=Context(),
+        conversation_id=conversation_id,
+        device_id=None,
+        language=turn.get("language") or "en",
+        agent_id=entity.entity_id,
+    )
+    chat_log = conversation.ChatLog(hass, conversation_id)
+    # Records only hold what their turn adds, the earlier turns of the
+    # conversation are rebuilt from their text and speech
+    for text, speech in turn.get("history") or ():
+        chat_log.async_add_user_content(conversation.UserContent(content=text))
+        chat_log.async_add_assistant_content_without_tools(
+            conversation.AssistantContent(
+                agent_id=entity.entity_id, content=speech or ""
+            )
+        )
+    chat_log.async_add_user_content(conversation.UserContent(content=turn["text"]))
+
+    result: dict[str, Any] = {
+        "text": turn["text"],
+        "recorded_duration": turn.get("duration"),
+    }
+    started = time.monotonic()
+    try:
+        await entity._async_handle_chat_log(chat_log, user_input=user_input)
+    except Exception as err:
+        LOGGER.debug("Replay of %r failed: %s", turn["text"], err)
+        result["error"] = str(err)
+    result["duration"] = round((time.monotonic() - started) * 1000)
+
+    last = chat_log.content[-1]
+    speech = last.content if isinstance(last, conversation.AssistantContent) else None
+    result["speech_matches"] = speech == turn.get("speech")
+    if not result["speech_matches"]:
+        result["speech"] = speech
+        result["recorded_speech"] = turn.get("speech")
+    return result
+
+
+def summarize(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Aggregate replay results."""
+    durations = [result["duration"] for result in results]
+    summary: dict[str, Any] = {
+        "turns": len(results),
+        "errors": sum("error" in result for result in results),
+        "mismatches": sum(not result["speech_matches"] for result in results),
+    }
+    if durations:
+        summary["mean_duration"] = round(statistics.fmean(durations))
+        summary["max_duration"] = max(durations)
+    if len(durations) >= 2:
+        summary["p95_duration"] = round(
+            statistics.quantiles(durations, n=20, method="inclusive")[-1]
+        )
+    return summary
@@ -0,0 +1,67 @@
+"""Sensor platform for the Grok Generative AI Conversation integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+
+from .const import DEFAULT_TITLE, DOMAIN
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddConfigEntryEntitiesCallback,
+) -> None:
+    """Set up sensors."""
+    async_add_entities([GrokPromptCacheSensor(config_entry)])
+
+
+class GrokPromptCacheSensor(SensorEntity):
+    """Share of prompt tokens served from the xAI prompt cache since startup."""
+
+    _attr_has_entity_name = True
+    _attr_translation_key = "prompt_cache_hit_rate"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        self._usage = entry.runtime_data.usage
+        self._attr_unique_id = f"{entry.entry_id}_prompt_cache_hit_rate"
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title or DEFAULT_TITLE,
+            manufacturer="xAI",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the cache hit rate."""
+        return self._usage.cache_hit_rate
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the token counters."""
+        return {
+            "requests": self._usage.requests,
+            "prompt_tokens": self._usage.prompt_tokens,
+            "cached_tokens": self._usage.cached_tokens,
+            "completion_tokens": self._usage.completion_tokens,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the usage counters."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._usage.async_add_listener(self.async_write_ha_state)
+        )
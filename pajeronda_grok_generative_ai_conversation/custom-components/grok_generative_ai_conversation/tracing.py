@@ -0,0 +1,347 @@
+"""Per-turn traces of the conversation pipeline, in the OpenTelemetry format."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import secrets
+import time
+from typing import Any, ContextManager
+
+import aiohttp
+
+from homeassistant.components import conversation
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    TRACE_BACKUP_COUNT,
+    TRACE_EXPORT_TIMEOUT,
+    TRACE_MAX_BYTES,
+)
+from .recorder import RotatingFile
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    """Encode attributes as OTLP key values, leaving out unset ones."""
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class _Trace:
+    """Spans of one conversation turn."""
+
+    __slots__ = ("trace_id", "spans", "root")
+
+    def __init__(self) -> None:
+        """Initialize the trace."""
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self.root: Span | None = None
+
+
+class Span:
+    """One timed operation of a traced turn."""
+
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start",
+        "end",
+        "attributes",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace: _Trace,
+        name: str,
+        parent_id: str | None,
+        kind: int = KIND_INTERNAL,
+        attributes: dict[str, Any] | None = None,
+        start: int | None = None,
+    ) -> None:
+        """Start the span."""
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = start or time.time_ns()
+        self.end: int | None = None
+        self.attributes = dict(attributes or {})
+        self.error: str | None = None
+        trace.spans.append(self)
+
+    def child(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        kind: int = KIND_INTERNAL,
+        start: int | None = None,
+    ) -> Span:
+        """Start a span nested in this one."""
+        return Span(self.trace, name, self.span_id, kind, attributes, start)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """End the span, marking it failed with an error."""
+        if self.end is not None:
+            return
+        self.end = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def as_otlp(self, end: int) -> dict[str, Any]:
+        """Return the span as OTLP JSON, ending it at end if still open."""
+        span: dict[str, Any] = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end or end),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": (
+                {"code": _STATUS_ERROR, "message": self.error}
+                if self.error
+                else {"code": _STATUS_OK}
+            ),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+# The innermost open span of the current task, None when tracing is off
+_SPAN: ContextVar[Span | None] = ContextVar(f"{DOMAIN}_span", default=None)
+
+
+@contextmanager
+def _span_context(span: Span) -> Iterator[Span]:
+    """Make a span current while the context runs, then end it."""
+    token = _SPAN.set(span)
+    try:
+        yield span
+    except BaseException as err:
+        span.finish(err)
+        raise
+    finally:
+        _SPAN.reset(token)
+        span.finish()
+
+
+def span(
+    name: str, attributes: dict[str, Any] | None = None, kind: int = KIND_INTERNAL
+) -> ContextManager[Span | None]:
+    """Trace the work done inside the context, if the turn is traced."""
+    if (parent := _SPAN.get()) is None:
+        return nullcontext()
+    return _span_context(parent.child(name, attributes, kind))
+
+
+def start_span(name: str, attributes: dict[str, Any] | None = None) -> Span | None:
+    """Start a span ended explicitly, for work spread over a stream."""
+    if (parent := _SPAN.get()) is None:
+        return None
+    return parent.child(name, attributes)
+
+
+def set_turn_attributes(attributes: dict[str, Any]) -> None:
+    """Add attributes to the root span of the traced turn, keeping existing ones."""
+    if (current := _SPAN.get()) is not None and current.trace.root is not None:
+        for key, value in attributes.items():
+            current.trace.root.attributes.setdefault(key, value)
+
+
+def trace_tool_content(content: Any, tool_spans: dict[str, Span]) -> None:
+    """Time tool calls from the content requesting them to their results."""
+    if (parent := _SPAN.get()) is None:
+        return
+    for tool_call in getattr(content, "tool_calls", None) or ():
+        tool_spans[tool_call.id] = parent.child(
+            f"tool {tool_call.tool_name}",
+            {
+                "gen_ai.tool.name": tool_call.tool_name,
+                "gen_ai.tool.call.id": tool_call.id,
+            },
+        )
+    tool_call_id = getattr(content, "tool_call_id", None)
+    if tool_call_id and (tool_span := tool_spans.pop(tool_call_id, None)):
+        tool_span.finish()
+        result = getattr(content, "tool_result", None)
+        if isinstance(result, dict) and "error" in result:
+            tool_span.error = f"{result['error']}: {result.get('error_text', '')}"
+
+
+class TracedStream:
+    """Stream wrapper timing the first chunk and the rest of the stream."""
+
+    def __init__(self, stream: Any, parent: Span, started: int) -> None:
+        """Initialize the wrapper, started is when the request was sent."""
+        self._stream = stream
+        self._parent = parent
+        self._started = started
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Yield the chunks of the wrapped stream."""
+        ttft = self._parent.child("ttft", start=self._started)
+        streaming: Span | None = None
+        try:
+            async for event in self._stream:
+                if streaming is None:
+                    ttft.finish()
+                    streaming = self._parent.child("stream")
+                if (usage := getattr(event, "usage", None)) is not None:
+                    self._parent.attributes["gen_ai.usage.input_tokens"] = getattr(
+                        usage, "prompt_tokens", None
+                    )
+                    self._parent.attributes["gen_ai.usage.output_tokens"] = getattr(
+                        usage, "completion_tokens", None
+                    )
+                yield event
+        finally:
+            ttft.finish()
+            if streaming is not None:
+                streaming.finish()
+
+    async def close(self) -> None:
+        """Close the wrapped stream."""
+        await self._stream.close()
+
+
+def trace_stream(stream: Any, started: int) -> Any:
+    """Trace an upstream stream of the current turn, returning the stream to read."""
+    if (parent := _SPAN.get()) is None:
+        return stream
+    return TracedStream(stream, parent, started)
+
+
+class Tracer:
+    """Trace conversation turns and export them as OTLP JSON.
+
+    Each turn is written as one line in the OTLP/HTTP JSON encoding to a
+    rotated file, and posted to an OTLP collector when an endpoint is set.
+    When tracing is off, the instrumented code only pays for a context
+    variable lookup per span.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        endpoint: str | None = None,
+        max_bytes: int = TRACE_MAX_BYTES,
+        backup_count: int = TRACE_BACKUP_COUNT,
+    ) -> None:
+        """Initialize the tracer."""
+        self.hass = hass
+        self._file = RotatingFile(hass, path, max_bytes, backup_count)
+        self.endpoint: str | None = None
+        if endpoint:
+            endpoint = endpoint.rstrip("/")
+            self.endpoint = (
+                endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+            )
+        self._resource = {
+            "attributes": _otlp_attributes(
+                {"service.name": DOMAIN, "service.instance.id": hass.config.location_name}
+            )
+        }
+
+    @contextmanager
+    def async_trace_turn(
+        self, user_input: conversation.ConversationInput
+    ) -> Iterator[Span]:
+        """Trace the turn handled inside the context."""
+        trace = _Trace()
+        root = trace.root = Span(
+            trace,
+            "conversation turn",
+            None,
+            attributes={
+                "gen_ai.system": "xai",
+                "gen_ai.conversation.id": user_input.conversation_id,
+                "conversation.agent_id": user_input.agent_id,
+                "conversation.language": user_input.language,
+                "conversation.device_id": user_input.device_id,
+                "conversation.satellite_id": getattr(user_input, "satellite_id", None),
+            },
+        )
+        try:
+            with _span_context(root):
+                yield root
+        finally:
+            self._async_export(trace)
+
+    @callback
+    def _async_export(self, trace: _Trace) -> None:
+        """Write the trace and post it to the collector."""
+        end = time.time_ns()
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": DOMAIN},
+                            "spans": [span.as_otlp(end) for span in trace.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        self._file.async_append(payload)
+        if self.endpoint:
+            self.hass.async_create_background_task(
+                self._async_post(self.endpoint, payload), f"{DOMAIN} trace export"
+            )
+
+    async def _async_post(self, endpoint: str, payload: dict[str, Any]) -> None:
+        """Post a trace to the OTLP/HTTP collector."""
+        try:
+            async with async_get_clientsession(self.hass).post(
+                endpoint,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=TRACE_EXPORT_TIMEOUT),
+            ) as response:
+                if response.status >= 400:
+                    LOGGER.debug(
+                        "Trace collector %s answered %s", endpoint, response.status
+                    )
+        except (aiohttp.ClientError, TimeoutError) as err:
+            LOGGER.debug("Cannot export trace to %s: %s", endpoint, err)
+
+
+def trace_turn(
+    tracer: Tracer | None, user_input: conversation.ConversationInput
+) -> ContextManager[Span | None]:
+    """Trace a turn if tracing is enabled."""
+    if tracer is None:
+        return nullcontext()
+    return tracer.async_trace_turn(user_input)
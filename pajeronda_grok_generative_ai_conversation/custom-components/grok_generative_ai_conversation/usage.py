@@ -0,0 +1,52 @@
+"""Token usage and prompt cache statistics of the xAI requests."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+
+class UsageStats:
+    """Count the tokens reported in the usage of each request.
+
+    Cached tokens are the part of the prompt served from the provider prompt
+    cache, their share of the prompt tokens is the cache hit rate.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def cache_hit_rate(self) -> float | None:
+        """Return the percentage of prompt tokens served from the cache."""
+        if not self.prompt_tokens:
+            return None
+        return round(self.cached_tokens / self.prompt_tokens * 100, 1)
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for updates, returning a callable that removes the listener."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_record(self, usage: Any) -> None:
+        """Record the usage reported for a request."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.requests += 1
+        self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.cached_tokens += getattr(details, "cached_tokens", 0) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,409 @@
+"""Soak test of the Grok conversation pipeline against a local fake client.
+
+Drives many simulated conversation, Assist handoff, tools fallback and AI
+Task turns through the integration, without network access, and watches the
+memory retained between samples with tracemalloc and object counts. Exits with
+status 1 when the retained memory per turn exceeds the threshold, printing the
+allocation sites that grew the most.
+
+Needs Home Assistant installed in the environment:
+
+    python scripts/soak.py --turns 20000 --max-bytes-per-turn 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import replace
+import gc
+import json
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import ai_task, conversation
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import intent, llm
+
+sys.path.insert(
+    0,
+    str(
+        Path(__file__).resolve().parent.parent
+        / "pajeronda_grok_generative_ai_conversation"
+        / "custom-components"
+    ),
+)
+
+from grok_generative_ai_conversation import GrokRuntimeData  # noqa: E402
+from grok_generative_ai_conversation.ai_task import (  # noqa: E402
+    GrokGenerativeAITaskEntity,
+)
+from grok_generative_ai_conversation.attachments import AttachmentEncoder  # noqa: E402
+from grok_generative_ai_conversation.circuit_breaker import CircuitBreaker  # noqa: E402
+from grok_generative_ai_conversation.client_pool import (  # noqa: E402
+    GrokClientPool,
+    PooledClient,
+)
+from grok_generative_ai_conversation.coalesce import SingleFlight  # noqa: E402
+from grok_generative_ai_conversation.const import TURN_DEADLINE  # noqa: E402
+from grok_generative_ai_conversation.conversation import (  # noqa: E402
+    GrokGenerativeAIConversationEntity,
+)
+from grok_generative_ai_conversation.entity_context import (  # noqa: E402
+    ExposedEntityContext,
+)
+from grok_generative_ai_conversation.deadline import Deadline  # noqa: E402
+from grok_generative_ai_conversation.jobs import JobManager  # noqa: E402
+from grok_generative_ai_conversation.llm_api_cache import AssistAPICache  # noqa: E402
+from grok_generative_ai_conversation.prompt_default import (  # noqa: E402
+    DEFAULT_CONVERSATION_PROMPT,
+)
+from grok_generative_ai_conversation.profiler import TurnProfiler  # noqa: E402
+from grok_generative_ai_conversation.usage import UsageStats  # noqa: E402
+
+COMMANDS = ("turn on the kitchen light", "close the garage", "play some jazz")
+FALLBACK_COMMANDS = ("set the lounge to movie mode", "water the lawn for 5 minutes")
+QUESTIONS = ("how far is the moon?", "tell me a short joke", "what is a haiku?")
+STRUCTURE = vol.Schema({vol.Required("value"): int})
+
+
+# --- Fake upstream -------------------------------------------------------------
+
+
+def _chunk(content: str | None = None, usage: Any = None) -> SimpleNamespace:
+    """Return a stream chunk shaped like the OpenAI SDK one."""
+    choices = (
+        []
+        if content is None
+        else [SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=None))]
+    )
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream:
+    """Stream of chunks, closed like an SDK stream."""
+
+    def __init__(self, text: str, prompt_tokens: int) -> None:
+        """Split the text the way the API streams it."""
+        self._chunks = [text[i : i + 7] for i in range(0, len(text), 7)]
+        self._usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=len(self._chunks),
+            prompt_tokens_details=SimpleNamespace(cached_tokens=prompt_tokens // 2),
+        )
+
+    async def __aiter__(self):
+        """Yield the chunks, then the usage."""
+        for chunk in self._chunks:
+            await asyncio.sleep(0)
+            yield _chunk(chunk)
+        yield _chunk(usage=self._usage)
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+class FakeCompletions:
+    """Answer like the router, the fallback or an AI Task would be answered."""
+
+    def __init__(self) -> None:
+        """Initialize the fake."""
+        self.with_raw_response = self
+        self.requests = 0
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        """Return a raw response whose parse() gives the stream."""
+        self.requests += 1
+        messages = kwargs["messages"]
+        last_user = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        if isinstance(last_user, list):
+            last_user = last_user[0]["text"]
+
+        if kwargs.get("response_format"):
+            text = json.dumps({"value": len(last_user)})
+        elif messages[0]["content"].startswith(llm.DEFAULT_INSTRUCTIONS_PROMPT[:40]):
+            text = "Done, the scene is set."
+        elif last_user in COMMANDS or last_user in FALLBACK_COMMANDS:
+            text = f'[[HA_LOCAL: {{"text": "{last_user}"}}]]'
+        else:
+            text = f"Here is an answer about {last_user} in a few short sentences."
+
+        prompt_tokens = sum(len(str(m["content"])) for m in messages) // 4
+        stream = FakeStream(text, prompt_tokens)
+        return SimpleNamespace(headers={}, parse=lambda: stream)
+
+
+class FakeAsyncOpenAI:
+    """Stand-in for AsyncOpenAI."""
+
+    def __init__(self) -> None:
+        """Initialize the fake."""
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+        self.models = SimpleNamespace(list=self._list_models)
+
+    async def _list_models(self) -> list[str]:
+        return ["grok-3-mini"]
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+class FakeHandoff:
+    """Local agent understanding the plain commands only."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the fake."""
+        self.hass = hass
+
+    async def async_process(
+        self, text: str, agent_id: str, language: str, user_input: Any
+    ) -> conversation.ConversationResult | None:
+        """Answer the commands, leave the rest to the tools fallback."""
+        response = intent.IntentResponse(language=language)
+        if text in COMMANDS:
+            response.async_set_speech("Done")
+        else:
+            response.async_set_error(
+                intent.IntentResponseErrorCode.NO_INTENT_MATCH, "Not understood"
+            )
+        return conversation.ConversationResult(response=response)
+
+
+class FakeAssistAPI:
+    """Assist API with a prompt and no tools."""
+
+    id = llm.LLM_API_ASSIST
+    name = "Assist"
+
+
+# --- Simulation ----------------------------------------------------------------
+
+
+class Soak:
+    """Run the simulated traffic."""
+
+    def __init__(self, hass: HomeAssistant, args: argparse.Namespace) -> None:
+        """Set up the integration objects around the fake client."""
+        self.hass = hass
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.client = FakeAsyncOpenAI()
+        pool = GrokClientPool([PooledClient(name="fake", client=self.client)])
+        pool.breaker = CircuitBreaker(hass, pool.async_probe)
+        self.entry = SimpleNamespace(
+            entry_id="soak",
+            title="Soak",
+            data={},
+            options={},
+            runtime_data=GrokRuntimeData(
+                client=pool,
+                single_flight=SingleFlight(hass),
+                breaker=pool.breaker,
+                assist_api=AssistAPICache(hass),
+                entity_context=ExposedEntityContext(hass),
+                attachments=AttachmentEncoder(hass, 1024),
+                profiler=TurnProfiler(hass),
+                jobs=JobManager(hass),
+                usage=UsageStats(),
+            ),
+        )
+        self.agent = self._entity(GrokGenerativeAIConversationEntity, "conversation")
+        self.agent._local_handoff = FakeHandoff(hass)
+        self.task_entity = self._entity(GrokGenerativeAITaskEntity, "ai_task_data")
+        # Chat logs kept between turns, as the conversation component does
+        self.chat_logs: dict[str, conversation.ChatLog] = {}
+        self.turns_left: dict[str, int] = {}
+
+    def _entity(self, cls: type, subentry_type: str) -> Any:
+        subentry = SimpleNamespace(
+            subentry_id=f"soak_{subentry_type}",
+            subentry_type=subentry_type,
+            title=subentry_type,
+            data={},
+        )
+        entity = cls(self.entry, subentry)
+        entity.hass = self.hass
+        entity.entity_id = f"{subentry_type.split('_')[0]}.soak"
+        return entity
+
+    def _chat_log(self, conversation_id: str, llm_api: Any) -> conversation.ChatLog:
+        """Continue or start a chat log, with a fresh system prompt."""
+        if (previous := self.chat_logs.get(conversation_id)) is not None:
+            chat_log = replace(previous, content=previous.content.copy())
+        else:
+            chat_log = conversation.ChatLog(self.hass, conversation_id)
+        chat_log.llm_api = llm_api
+        prompt = (
+            f"Current time is {time.strftime('%H:%M:%S')}. "
+            f"Today's date is {time.strftime('%Y-%m-%d')}.\n"
+            f"{DEFAULT_CONVERSATION_PROMPT}\n{llm_api.api_prompt}"
+        )
+        chat_log.content[0] = conversation.SystemContent(content=prompt)
+        return chat_log
+
+    async def conversation_turn(self, text: str) -> None:
+        """Run one conversation turn on one of the active conversations."""
+        if len(self.turns_left) < self.args.conversations:
+            conversation_id = f"conv_{self.random.getrandbits(64):x}"
+            self.turns_left[conversation_id] = self.random.randint(1, 40)
+        else:
+            conversation_id = self.random.choice(list(self.turns_left))
+
+        user_input = conversation.ConversationInput(
+            text=text,
+            context=Context(),
+            conversation_id=conversation_id,
+            device_id=None,
+            language="en",
+            agent_id=self.agent.entity_id,
+        )
+        llm_api = llm.APIInstance(
+            api=FakeAssistAPI(),
+            api_prompt=f"Exposed: light.kitchen is {self.random.choice(['on', 'off'])}",
+            llm_context=user_input.as_llm_context("soak"),
+            tools=[],
+        )
+        chat_log = self._chat_log(conversation_id, llm_api)
+        chat_log.async_add_user_content(conversation.UserContent(content=text))
+        await self.agent._async_handle_chat_log(
+            chat_log, user_input=user_input, deadline=Deadline(TURN_DEADLINE)
+        )
+        self.chat_logs[conversation_id] = chat_log
+
+        self.turns_left[conversation_id] -= 1
+        if not self.turns_left[conversation_id]:
+            # The chat session ends
+            del self.turns_left[conversation_id]
+            del self.chat_logs[conversation_id]
+
+    async def ai_task_turn(self) -> None:
+        """Run one AI Task generation, structured half of the time."""
+        structure = STRUCTURE if self.random.random() < 0.5 else None
+        task = ai_task.GenDataTask(
+            name="soak", instructions=self.random.choice(QUESTIONS), structure=structure
+        )
+        chat_log = conversation.ChatLog(
+            self.hass, f"task_{self.random.getrandbits(64):x}"
+        )
+        chat_log.async_add_user_content(
+            conversation.UserContent(content=task.instructions)
+        )
+        await self.task_entity._async_generate_data(task, chat_log)
+
+    async def turn(self) -> None:
+        """Run one turn of the traffic mix."""
+        roll = self.random.random()
+        if roll < 0.5:
+            await self.conversation_turn(self.random.choice(QUESTIONS))
+        elif roll < 0.7:
+            await self.conversation_turn(self.random.choice(COMMANDS))
+        elif roll < 0.85:
+            await self.conversation_turn(self.random.choice(FALLBACK_COMMANDS))
+        else:
+            await self.ai_task_turn()
+
+    async def batch(self, turns: int) -> None:
+        """Run turns, a few at a time like concurrent satellites."""
+        for start in range(0, turns, self.args.concurrency):
+            await asyncio.gather(
+                *(self.turn() for _ in range(min(self.args.concurrency, turns - start)))
+            )
+
+
+# --- Measurement ---------------------------------------------------------------
+
+
+def _object_counts() -> Counter[str]:
+    """Count live objects by type."""
+    gc.collect()
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    """Run the soak test, returning the exit status."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        soak = Soak(hass, args)
+
+        # Warm up caches and lazy imports before measuring
+        await soak.batch(args.warmup)
+        tracemalloc.start(args.frames)
+        gc.collect()
+        baseline = tracemalloc.take_snapshot()
+        baseline_objects = _object_counts()
+
+        samples = []
+        step = max(1, args.turns // args.samples)
+        started = time.monotonic()
+        for done in range(step, args.turns + 1, step):
+            await soak.batch(step)
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append((done, current))
+            print(
+                f"{done:>8} turns  traced {current / 1024:>9.1f} KiB  "
+                f"conversations {len(soak.chat_logs):>4}  "
+                f"message cache {len(soak.agent._message_cache):>4}"
+            )
+        elapsed = time.monotonic() - started
+
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        object_growth = _object_counts() - baseline_objects
+        await hass.async_stop(force=True)
+
+    # Compare the second half with its start, the first half can still be
+    # filling bounded caches up to their limit
+    half = len(samples) // 2
+    (first_turns, first_bytes), (last_turns, last_bytes) = samples[half], samples[-1]
+    per_turn = (last_bytes - first_bytes) / max(1, last_turns - first_turns)
+
+    print(f"\n{args.turns} turns in {elapsed:.1f} s ({args.turns / elapsed:.0f}/s)")
+    print(f"Upstream requests: {soak.client.chat.completions.requests}")
+    print(f"Retained memory per turn: {per_turn:.1f} bytes")
+    print("\nTop growing allocation sites:")
+    for stat in snapshot.compare_to(baseline, "lineno")[: args.top]:
+        print(f"  {stat}")
+    print("\nTop growing object types:")
+    for name, count in object_growth.most_common(args.top):
+        print(f"  {name}: +{count}")
+
+    if per_turn > args.max_bytes_per_turn:
+        print(
+            f"\nFAIL: {per_turn:.1f} bytes retained per turn, "
+            f"limit is {args.max_bytes_per_turn}"
+        )
+        return 1
+    print("\nOK")
+    return 0
+
+
+def main() -> None:
+    """Parse the arguments and run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--max-bytes-per-turn", type=float, default=64)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(asyncio.run(async_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()